@@ -1,11 +1,63 @@
+import asyncio
 import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
+
 from .logging import get_logger
 
 APP_NAME = os.getenv("MCP_SERVER_NAME", "fastmcp-unified")
-mcp = FastMCP(APP_NAME)
 logger = get_logger("server")
 
+# Async callbacks run in the background when the server starts (e.g. warming
+# connections) and when it shuts down (e.g. closing shared HTTP clients).
+# Keyed by qualified name so hot-reloaded modules replace rather than duplicate hooks.
+_startup_hooks: dict[str, Callable[[], Awaitable[None]]] = {}
+_shutdown_hooks: dict[str, Callable[[], Awaitable[None]]] = {}
+
+
+def on_startup(fn: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    """Register an async callback to run in the background when the server starts."""
+    _startup_hooks[f"{fn.__module__}.{fn.__qualname__}"] = fn
+    return fn
+
+
+def on_shutdown(fn: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    """Register an async callback to run when the server lifespan exits."""
+    _shutdown_hooks[f"{fn.__module__}.{fn.__qualname__}"] = fn
+    return fn
+
+
+async def _run_startup_hook(name: str, hook: Callable[[], Awaitable[None]]) -> None:
+    try:
+        await hook()
+    except Exception:
+        logger.exception(f"Startup hook failed: {name}")
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[dict]:
+    # Startup hooks are not awaited so they never delay serving the first request
+    startup_tasks = [
+        asyncio.create_task(_run_startup_hook(name, hook))
+        for name, hook in list(_startup_hooks.items())
+    ]
+    try:
+        yield {}
+    finally:
+        for task in startup_tasks:
+            task.cancel()
+        await asyncio.gather(*startup_tasks, return_exceptions=True)
+        for name, hook in list(_shutdown_hooks.items()):
+            try:
+                await hook()
+            except Exception:
+                logger.exception(f"Shutdown hook failed: {name}")
+
+
+mcp = FastMCP(APP_NAME, lifespan=_lifespan)
+
 # Import prompts module to trigger decorator registration
 # This must happen after mcp is created but before the server runs
 try:
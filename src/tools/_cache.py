@@ -0,0 +1,111 @@
+"""In-process TTL cache for backend responses.
+
+UCR data is refreshed monthly with a ~2 month reporting lag, so identical
+requests within a session can safely reuse earlier responses. Only successful
+results are stored; errors always propagate to the caller.
+
+The default TTL can be overridden with the ``UCR_CACHE_TTL`` environment
+variable (seconds).
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+DEFAULT_TTL = float(os.getenv("UCR_CACHE_TTL", "3600"))
+DEFAULT_MAXSIZE = 256
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire ``ttl`` seconds after insertion."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the oldest entry when full."""
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._data.clear()
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached value for key, calling fetch on a miss.
+
+        Concurrent misses for the same key share one in-flight task and
+        receive the same result or exception. Each caller awaits the task
+        through ``asyncio.shield``, so cancelling one caller (including the
+        one that started the fetch) does not cancel the others; the task is
+        only cancelled once every caller waiting on it has gone away.
+
+        Args:
+            key: Hashable cache key built from normalized request parameters
+            fetch: Zero-argument coroutine factory performing the request
+
+        Returns:
+            Cached or freshly fetched value
+
+        Raises:
+            Exception: Whatever fetch raises (errors are not cached)
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, fetch))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1:
+                task.cancel()  # Last interested caller left; free the connection
+            raise
+        finally:
+            remaining = self._waiters.pop(task) - 1
+            if remaining:
+                self._waiters[task] = remaining
+
+    async def _fill(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fetch for key and store a successful result."""
+        try:
+            value = await fetch()
+            self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """Mark a finished task's exception as retrieved to avoid loop warnings."""
+    if not task.cancelled():
+        task.exception()
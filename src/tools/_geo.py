@@ -0,0 +1,27 @@
+"""Geographic constants shared by the UCR tools.
+
+State-level models and FBI history are available for the same five states,
+so every tool validates and labels locations from this single table.
+"""
+
+from types import MappingProxyType
+
+# State name mapping for display (read-only so tools cannot diverge at runtime)
+STATE_NAMES = MappingProxyType(
+    {
+        "CA": "California",
+        "TX": "Texas",
+        "FL": "Florida",
+        "NY": "New York",
+        "IL": "Illinois",
+    }
+)
+
+# Supported states for state-level data
+VALID_STATES = frozenset(STATE_NAMES)
+
+# Code lookup covering the usual spellings ("CA", "ca"), so most inputs
+# normalize with a single probe before falling back to strip()/upper()
+STATE_LOOKUP = MappingProxyType(
+    {code: code for code in STATE_NAMES} | {code.lower(): code for code in STATE_NAMES}
+)
@@ -0,0 +1,195 @@
+"""Shared HTTP clients for the upstream APIs.
+
+Tools reuse one pooled ``httpx.AsyncClient`` per base URL (the FBI UCR
+prediction backend by default, or the FBI Crime Data Explorer API) so repeated
+calls skip the TCP/TLS handshake. HTTP/2 lets concurrent requests to the same
+host share one connection. Responses are requested gzip/brotli-compressed.
+Clients are created lazily on first use and closed when the server shuts down;
+at startup each upstream is touched once so the first tool call finds a warm
+connection.
+
+``revalidating_get`` remembers ``ETag``/``Last-Modified`` validators so a
+refresh of an expired cache entry can be answered with ``304 Not Modified``
+and reuse the previously parsed body.
+
+``with_retry`` retries transient failures (timeouts, dropped connections,
+429/502/503/504) with jittered exponential backoff, honouring ``Retry-After``.
+Failed connection attempts are additionally retried by the transport.
+"""
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+import httpx
+import orjson
+
+from core.app import on_shutdown, on_startup
+from tools._cache import TTLCache
+
+# Backend API configuration
+UCR_API_BASE = "https://fbi-ucr-fbi-ucr.apps.cluster-tw52m.tw52m.sandbox448.opentlc.com"
+FBI_API_BASE = "https://api.usa.gov/crime/fbi/cde"
+
+# Connect and pool waits are bounded separately so a saturated pool fails fast
+UCR_TIMEOUT = httpx.Timeout(30.0, connect=5.0, pool=5.0)
+UCR_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=40,
+    keepalive_expiry=30.0,
+)
+
+# Retry policy for transient backend failures
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.2
+RETRY_AFTER_MAX = 10.0  # Never wait longer than this on a Retry-After header
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+CONNECT_RETRIES = 2  # Connection failures retried inside the transport
+
+# Monthly series compress well; httpx decodes both transparently (br via brotli)
+UCR_HEADERS = {"Accept-Encoding": "gzip, br"}
+
+_CLIENTS: dict[str, httpx.AsyncClient] = {}
+
+# Conditional-request validators and the parsed body they validate, by cache key.
+# Kept well beyond the response TTLs so expired entries can still revalidate.
+_VALIDATED = TTLCache(ttl=7 * 24 * 3600, maxsize=512)
+
+T = TypeVar("T")
+
+
+def get_client(base_url: str = UCR_API_BASE) -> httpx.AsyncClient:
+    """Return the shared client for base_url, creating it on first use.
+
+    Args:
+        base_url: API root the client resolves relative paths against
+
+    Returns:
+        Pooled client with ``base_url`` set
+    """
+    client = _CLIENTS.get(base_url)
+    if client is None or client.is_closed:
+        # Pool options live on the transport once one is passed explicitly
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=UCR_LIMITS,
+            retries=CONNECT_RETRIES,
+        )
+        client = _CLIENTS[base_url] = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            headers=UCR_HEADERS,
+            timeout=UCR_TIMEOUT,
+        )
+    return client
+
+
+@on_startup
+async def prewarm_clients() -> None:
+    """Open a connection to each upstream so the first tool call skips DNS/TLS."""
+
+    async def touch(base_url: str) -> None:
+        try:
+            # Any response, even an error status, leaves a live pooled connection
+            await get_client(base_url).head("/")
+        except httpx.HTTPError:
+            pass  # Best effort; the first real request connects as usual
+
+    await asyncio.gather(touch(UCR_API_BASE), touch(FBI_API_BASE))
+
+
+@on_shutdown
+async def aclose_client() -> None:
+    """Close every shared client that was created."""
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def raise_and_parse_json(response: httpx.Response) -> Any:
+    """Raise for error statuses, otherwise return the decoded JSON body."""
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+async def revalidating_get(
+    client: httpx.AsyncClient,
+    url: str,
+    key: Hashable,
+    parse: Callable[[httpx.Response], Any] = raise_and_parse_json,
+    **kwargs: Any,
+) -> Any:
+    """GET url, sending validators from the last response stored under key.
+
+    On ``304 Not Modified`` the previously parsed body is returned without
+    reading or decoding the new response.
+
+    Args:
+        client: Client to send the request with
+        url: URL or path relative to the client's base_url
+        key: Hashable identity of the request, e.g. its cache key
+        parse: Turns a fresh response into a value; raises for bad statuses
+        **kwargs: Passed through to ``client.get`` (e.g. ``params``)
+
+    Returns:
+        Parsed body, fresh or revalidated
+    """
+    previous = _VALIDATED.get(key)
+    headers = previous[0] if previous is not None else None
+    response = await client.get(url, headers=headers, **kwargs)
+    if response.status_code == 304 and previous is not None:
+        return previous[1]
+
+    value = parse(response)
+    validators = {}
+    if etag := response.headers.get("ETag"):
+        validators["If-None-Match"] = etag
+    if last_modified := response.headers.get("Last-Modified"):
+        validators["If-Modified-Since"] = last_modified
+    if validators:
+        _VALIDATED.set(key, (validators, value))
+    return value
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    """Parse a Retry-After header in seconds, capped at ``RETRY_AFTER_MAX``."""
+    try:
+        delay = float(response.headers.get("Retry-After", default))
+    except ValueError:  # HTTP-date form is not worth parsing here
+        delay = default
+    return min(max(delay, 0.0), RETRY_AFTER_MAX)
+
+
+async def with_retry(
+    request: Callable[[], Awaitable[T]],
+    attempts: int = RETRY_ATTEMPTS,
+) -> T:
+    """Await ``request()``, retrying transient backend failures.
+
+    Args:
+        request: Zero-argument coroutine factory performing one attempt
+        attempts: Maximum number of attempts
+
+    Returns:
+        Result of the first successful attempt
+
+    Raises:
+        httpx.HTTPError: The last error if every attempt fails, or any
+            non-transient error immediately
+    """
+    for attempt in range(attempts):
+        last = attempt == attempts - 1
+        try:
+            return await request()
+        except (httpx.TimeoutException, httpx.RemoteProtocolError):
+            if last:
+                raise
+            delay = RETRY_BASE_DELAY * (2**attempt) + random.random() * 0.1
+        except httpx.HTTPStatusError as e:
+            if last or e.response.status_code not in RETRY_STATUS_CODES:
+                raise
+            delay = _retry_after(e.response, RETRY_BASE_DELAY * (2**attempt) + 0.3)
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")  # pragma: no cover
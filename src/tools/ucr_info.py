@@ -19,25 +19,27 @@ NOT SUPPORTED:
 
 from typing import Annotated
 import httpx
+import orjson
 from fastmcp.exceptions import ToolError
 from pydantic import Field
 from core.app import mcp
+from tools._cache import TTLCache
+from tools._geo import STATE_NAMES, VALID_STATES
+from tools._http import UCR_API_BASE, get_client, revalidating_get
 
 
 # Base URL for the FBI UCR API
-BASE_URL = "https://fbi-ucr-fbi-ucr.apps.cluster-tw52m.tw52m.sandbox448.opentlc.com"
-
-# Supported states for state-level predictions
-VALID_STATES = frozenset(["CA", "TX", "FL", "NY", "IL"])
-
-# State name mapping for display
-STATE_NAMES = {
-    "CA": "California",
-    "TX": "Texas",
-    "FL": "Florida",
-    "NY": "New York",
-    "IL": "Illinois",
-}
+BASE_URL = UCR_API_BASE
+
+# Model metadata keyed on state; models are retrained rarely, so the default
+# one-hour TTL is conservative
+_models_cache = TTLCache()
+
+# Formatted tool output keyed on every parameter that affects it
+_output_cache = TTLCache()
+
+# Valid-option list for the state error message
+_VALID_STATE_LIST = ", ".join(sorted(VALID_STATES))
 
 # Static offense descriptions
 OFFENSE_DESCRIPTIONS = {
@@ -73,21 +75,20 @@ OFFENSE_DETAILS = {
 }
 
 
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+
 def _format_month(date_str: str) -> str:
     """Convert date string (e.g., '2024-12') to readable format (e.g., 'December 2024')."""
-    month_names = [
-        "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December"
-    ]
-    try:
-        parts = date_str.split("-")
-        if len(parts) >= 2:
-            year = parts[0]
-            month_num = int(parts[1])
-            if 1 <= month_num <= 12:
-                return f"{month_names[month_num - 1]} {year}"
-    except (ValueError, IndexError):
-        pass
+    year, _, rest = date_str.partition("-")
+    month = rest.partition("-")[0]
+    if year.isdigit() and month.isdigit():
+        month_num = int(month)
+        if 1 <= month_num <= 12:
+            return f"{_MONTHS[month_num - 1]} {year}"
     return date_str
 
 
@@ -128,19 +129,28 @@ def _format_all_models(models: list[dict], state: str | None = None) -> str:
         # Show national models when no state specified
         filtered_models = [m for m in models if m.get("location") == "national"]
 
+    # Bind hot-loop lookups locally; this runs once per listed model
+    description_get = OFFENSE_DESCRIPTIONS.get
+    format_month = _format_month
+    format_model_type = _format_model_type
+    extend = lines.extend
     for idx, model in enumerate(filtered_models, 1):
         offense = model.get("offense", "unknown")
-        description = OFFENSE_DESCRIPTIONS.get(offense, model.get("description", "No description available"))
-        model_type = _format_model_type(model)
+        description = description_get(offense, model.get("description", "No description available"))
+        model_type = format_model_type(model)
         mape = model.get("mape", 0)
         accuracy = 100 - mape
-        training_end = _format_month(model.get("training_end", "Unknown"))
-
-        lines.append(f"{idx}. {offense}")
-        lines.append(f"   Description: {description}")
-        lines.append(f"   Model: {model_type} | Accuracy: {accuracy:.1f}% (MAPE: {mape:.1f}%)")
-        lines.append(f"   Training data through: {training_end}")
-        lines.append("")
+        training_end = format_month(model.get("training_end", "Unknown"))
+
+        extend(
+            (
+                f"{idx}. {offense}",
+                f"   Description: {description}",
+                f"   Model: {model_type} | Accuracy: {accuracy:.1f}% (MAPE: {mape:.1f}%)",
+                f"   Training data through: {training_end}",
+                "",
+            )
+        )
 
     lines.append("Data source: FBI Uniform Crime Reporting (UCR) Program")
     if state:
@@ -198,6 +208,43 @@ def _format_model_details(model: dict) -> str:
     return "\n".join(lines)
 
 
+def _parse_models_response(response: httpx.Response) -> dict:
+    """Decode a models response, raising ToolError for non-200 statuses."""
+    if response.status_code != 200:
+        raise ToolError(f"Failed to fetch model information: HTTP {response.status_code}")
+    return orjson.loads(response.content)
+
+
+async def fetch_models(state: str | None = None) -> dict:
+    """Fetch model metadata from the API, reusing a cached response when available.
+
+    Args:
+        state: Optional state code to filter models
+
+    Returns:
+        API response as dict
+
+    Raises:
+        ToolError: If the API returns a non-200 status
+        httpx.HTTPError: If the request fails
+    """
+    params = {}
+    if state:
+        params["state"] = state
+    key = ("models", state)
+
+    async def request() -> dict:
+        return await revalidating_get(
+            get_client(),
+            "/api/v1/models",
+            key,
+            _parse_models_response,
+            params=params,
+        )
+
+    return await _models_cache.get_or_fetch(key, request)
+
+
 @mcp.tool(
     annotations={
         "readOnlyHint": True,
@@ -206,17 +253,21 @@ def _format_model_details(model: dict) -> str:
     }
 )
 async def ucr_info(
-    offense: str | None = Field(
-        default=None,
-        description="Specific offense to get details for. Valid values: violent-crime, property-crime, homicide, burglary, motor-vehicle-theft. If omitted, lists all available models."
-    ),
-    state: str | None = Field(
-        default=None,
-        description=(
-            "State code to filter models (CA, TX, FL, NY, IL). "
-            "If omitted, shows national-level models."
+    offense: Annotated[
+        str | None,
+        Field(
+            description="Specific offense to get details for. Valid values: violent-crime, property-crime, homicide, burglary, motor-vehicle-theft. If omitted, lists all available models."
+        ),
+    ] = None,
+    state: Annotated[
+        str | None,
+        Field(
+            description=(
+                "State code to filter models (CA, TX, FL, NY, IL). "
+                "If omitted, shows national-level models."
+            ),
         ),
-    ),
+    ] = None,
 ) -> str:
     """Get information about available FBI UCR crime forecasting models.
 
@@ -242,50 +293,48 @@ async def ucr_info(
     if state is not None:
         state_upper = state.upper().strip()
         if state_upper not in VALID_STATES:
-            valid_list = ", ".join(sorted(VALID_STATES))
             raise ToolError(
                 f"Invalid state code: '{state}'. "
-                f"Valid options are: {valid_list}. "
+                f"Valid options are: {_VALID_STATE_LIST}. "
                 "Use 2-letter state codes (e.g., 'CA' for California)."
             )
         normalized_state = state_upper
 
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Build query params
-            params = {}
-            if normalized_state:
-                params["state"] = normalized_state
+    # Repeat calls skip both the models fetch and the formatting
+    offense_lower = offense.lower().strip() if offense is not None else None
+    output_key = (normalized_state, offense_lower)
+    cached_output = _output_cache.get(output_key)
+    if cached_output is not None:
+        return cached_output
 
-            response = await client.get(f"{BASE_URL}/api/v1/models", params=params)
-
-            if response.status_code != 200:
-                raise ToolError(f"Failed to fetch model information: HTTP {response.status_code}")
-
-            data = response.json()
-            models = data.get("models", [])
-
-            if not models:
-                if normalized_state:
-                    raise ToolError(f"No models available for state: {normalized_state}")
-                raise ToolError("No models available from the API")
-
-            # If no offense specified, list all models
-            if offense is None:
-                return _format_all_models(models, normalized_state)
-
-            # Find the specific model
-            offense_lower = offense.lower().strip()
-            for model in models:
-                if model.get("offense", "").lower() == offense_lower:
-                    return _format_model_details(model)
+    try:
+        data = await fetch_models(normalized_state)
+        models = data.get("models", [])
 
-            # Offense not found - provide helpful error
-            available = [m.get("offense") for m in models if m.get("offense")]
-            unique_offenses = sorted(set(available))
-            raise ToolError(
-                f"Offense '{offense}' not found. Available offenses: {', '.join(unique_offenses)}"
-            )
+        if not models:
+            if normalized_state:
+                raise ToolError(f"No models available for state: {normalized_state}")
+            raise ToolError("No models available from the API")
+
+        # If no offense specified, list all models
+        if offense_lower is None:
+            output = _format_all_models(models, normalized_state)
+            _output_cache.set(output_key, output)
+            return output
+
+        # Find the specific model
+        for model in models:
+            if model.get("offense", "").lower() == offense_lower:
+                output = _format_model_details(model)
+                _output_cache.set(output_key, output)
+                return output
+
+        # Offense not found - provide helpful error
+        available = [m.get("offense") for m in models if m.get("offense")]
+        unique_offenses = sorted(set(available))
+        raise ToolError(
+            f"Offense '{offense}' not found. Available offenses: {', '.join(unique_offenses)}"
+        )
 
     except httpx.TimeoutException:
         raise ToolError("Request timed out while fetching model information")
@@ -41,7 +41,6 @@ def _make_token(payload: dict) -> str:
     )
 
 
-@pytest.mark.asyncio
 async def test_requires_scopes_allows_when_present():
     @requires_scopes("read")
     async def secured(ctx=None):
@@ -53,7 +52,6 @@ async def test_requires_scopes_allows_when_present():
     assert result == {"ok": True}
 
 
-@pytest.mark.asyncio
 async def test_requires_scopes_denies_when_missing():
     @requires_scopes("admin")
     async def secured(ctx=None):
@@ -66,7 +64,6 @@ async def test_requires_scopes_denies_when_missing():
     assert "admin" in result.get("missing", [])
 
 
-@pytest.mark.asyncio
 async def test_requires_scopes_missing_context():
     @requires_scopes("read")
     async def secured():
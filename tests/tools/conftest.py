@@ -0,0 +1,220 @@
+"""Shared backend payload fixtures for the tool tests.
+
+The payloads are read-only literals, so they are built once per session.
+Tests must not mutate them; copy first if a variant is needed.
+
+Backend traffic is mocked with respx routes or an httpx.MockTransport
+handler where a test only needs responses (or wants to inspect the real
+requests), and with a per-test AsyncMock client where it asserts on calls.
+Mock clients are never shared across tests: their call records would leak.
+"""
+
+import httpx
+import pytest
+
+
+@pytest.fixture(scope="session")
+def make_response():
+    """Factory for real httpx responses to hand back from a mocked client."""
+    # raise_for_status() refuses to run on a response without a request
+    request = httpx.Request("GET", "https://backend.test")
+
+    def make(json_data=None, status_code=200):
+        return httpx.Response(status_code, json=json_data, request=request)
+
+    return make
+
+
+# --- ucr_compare backend payloads ---
+
+
+@pytest.fixture(scope="session")
+def mock_prediction_violent_crime():
+    """Mock prediction response for violent-crime."""
+    return {
+        "offense": "violent-crime",
+        "predictions": [
+            {"date": "2025-01", "predicted": 85000, "lower": 80000, "upper": 90000},
+            {"date": "2025-02", "predicted": 85100, "lower": 79000, "upper": 91000},
+            {"date": "2025-03", "predicted": 85200, "lower": 78000, "upper": 92000},
+            {"date": "2025-04", "predicted": 85300, "lower": 77000, "upper": 93000},
+            {"date": "2025-05", "predicted": 85400, "lower": 76000, "upper": 94000},
+            {"date": "2025-06", "predicted": 84800, "lower": 75000, "upper": 95000},
+        ],
+        "metadata": {
+            "model_type": "ARIMA",
+            "mape": 9.0,
+            "training_end": "Dec 2024",
+        },
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_history_violent_crime():
+    """Mock history response for violent-crime."""
+    return {
+        "offense": "violent-crime",
+        "data": [
+            {"date": "2024-12", "count": 85000},
+        ],
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_prediction_property_crime():
+    """Mock prediction response for property-crime."""
+    return {
+        "offense": "property-crime",
+        "predictions": [
+            {"date": "2025-01", "predicted": 250000, "lower": 240000, "upper": 260000},
+            {"date": "2025-02", "predicted": 249000, "lower": 238000, "upper": 261000},
+            {"date": "2025-03", "predicted": 248000, "lower": 236000, "upper": 262000},
+            {"date": "2025-04", "predicted": 247000, "lower": 234000, "upper": 263000},
+            {"date": "2025-05", "predicted": 246000, "lower": 232000, "upper": 264000},
+            {"date": "2025-06", "predicted": 245000, "lower": 230000, "upper": 265000},
+        ],
+        "metadata": {
+            "model_type": "ARIMA",
+            "mape": 7.9,
+            "training_end": "Dec 2024",
+        },
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_history_property_crime():
+    """Mock history response for property-crime."""
+    return {
+        "offense": "property-crime",
+        "data": [
+            {"date": "2024-12", "count": 250000},
+        ],
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_prediction_homicide():
+    """Mock prediction response for homicide."""
+    return {
+        "offense": "homicide",
+        "predictions": [
+            {"date": "2025-01", "predicted": 1500, "lower": 1400, "upper": 1600},
+            {"date": "2025-02", "predicted": 1480, "lower": 1350, "upper": 1610},
+            {"date": "2025-03", "predicted": 1460, "lower": 1300, "upper": 1620},
+            {"date": "2025-04", "predicted": 1440, "lower": 1250, "upper": 1630},
+            {"date": "2025-05", "predicted": 1420, "lower": 1200, "upper": 1640},
+            {"date": "2025-06", "predicted": 1400, "lower": 1150, "upper": 1650},
+        ],
+        "metadata": {
+            "model_type": "Prophet",
+            "mape": 8.2,
+            "training_end": "Dec 2024",
+        },
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_history_homicide():
+    """Mock history response for homicide."""
+    return {
+        "offense": "homicide",
+        "data": [
+            {"date": "2024-12", "count": 1500},
+        ],
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_prediction_burglary():
+    """Mock prediction response for burglary."""
+    return {
+        "offense": "burglary",
+        "predictions": [
+            {"date": "2025-01", "predicted": 100000, "lower": 95000, "upper": 105000},
+            {"date": "2025-02", "predicted": 99000, "lower": 93000, "upper": 106000},
+            {"date": "2025-03", "predicted": 98000, "lower": 91000, "upper": 107000},
+            {"date": "2025-04", "predicted": 97000, "lower": 89000, "upper": 108000},
+            {"date": "2025-05", "predicted": 96000, "lower": 87000, "upper": 109000},
+            {"date": "2025-06", "predicted": 95000, "lower": 85000, "upper": 110000},
+        ],
+        "metadata": {
+            "model_type": "ARIMA",
+            "mape": 7.7,
+            "training_end": "Dec 2024",
+        },
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_history_burglary():
+    """Mock history response for burglary."""
+    return {
+        "offense": "burglary",
+        "data": [
+            {"date": "2024-12", "count": 100000},
+        ],
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_prediction_mvt():
+    """Mock prediction response for motor-vehicle-theft with significant increase."""
+    return {
+        "offense": "motor-vehicle-theft",
+        "predictions": [
+            {"date": "2025-01", "predicted": 72000, "lower": 68000, "upper": 76000},
+            {"date": "2025-02", "predicted": 74000, "lower": 69000, "upper": 79000},
+            {"date": "2025-03", "predicted": 76000, "lower": 70000, "upper": 82000},
+            {"date": "2025-04", "predicted": 78000, "lower": 71000, "upper": 85000},
+            {"date": "2025-05", "predicted": 80000, "lower": 72000, "upper": 88000},
+            {"date": "2025-06", "predicted": 83822, "lower": 73000, "upper": 95000},
+        ],
+        "metadata": {
+            "model_type": "SARIMA",
+            "mape": 5.4,
+            "training_end": "Dec 2024",
+        },
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_history_mvt():
+    """Mock history response for motor-vehicle-theft."""
+    return {
+        "offense": "motor-vehicle-theft",
+        "data": [
+            {"date": "2024-12", "count": 70000},
+        ],
+    }
+
+
+# --- ucr_forecast backend payloads ---
+
+
+@pytest.fixture(scope="session")
+def sample_prediction_response():
+    """Sample successful prediction API response."""
+    return {
+        "predictions": [
+            {"date": "2025-01", "predicted": 85000, "lower": 80000, "upper": 90000},
+            {"date": "2025-02", "predicted": 86000, "lower": 81000, "upper": 91000},
+            {"date": "2025-03", "predicted": 87500, "lower": 82000, "upper": 93000},
+        ],
+        "model": {
+            "model_type": "SARIMA",
+            "mape": 3.5,
+            "training_end": "2024-12",
+        },
+    }
+
+
+@pytest.fixture(scope="session")
+def sample_history_response():
+    """Sample successful history API response."""
+    return {
+        "history": [
+            {"date": "2024-10", "incidents": 82000},
+            {"date": "2024-11", "incidents": 83500},
+            {"date": "2024-12", "incidents": 84000},
+        ]
+    }
@@ -0,0 +1,142 @@
+"""Tests for the TTL response cache."""
+
+import asyncio
+
+import pytest
+
+from tools._cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache get/set behavior."""
+
+    def test_set_and_get(self):
+        """Stored values should be returned until they expire."""
+        cache = TTLCache(ttl=60)
+        cache.set("key", {"value": 1})
+        assert cache.get("key") == {"value": 1}
+
+    def test_missing_key(self):
+        """Missing keys should return None."""
+        assert TTLCache().get("missing") is None
+
+    def test_expired_entry(self):
+        """Expired entries should be dropped."""
+        cache = TTLCache(ttl=0)
+        cache.set("key", {"value": 1})
+        assert cache.get("key") is None
+
+    def test_maxsize_evicts_oldest(self):
+        """The oldest entry should be evicted when the cache is full."""
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+
+class TestGetOrFetch:
+    """Tests for TTLCache.get_or_fetch."""
+
+    async def test_hit_skips_fetch(self):
+        """A cached value should be returned without calling fetch."""
+        cache = TTLCache(ttl=60)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return {"value": calls}
+
+        assert await cache.get_or_fetch("key", fetch) == {"value": 1}
+        assert await cache.get_or_fetch("key", fetch) == {"value": 1}
+        assert calls == 1
+
+    async def test_concurrent_misses_coalesce(self):
+        """Concurrent misses for one key should trigger a single fetch."""
+        cache = TTLCache(ttl=60)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": calls}
+
+        results = await asyncio.gather(*(cache.get_or_fetch("key", fetch) for _ in range(5)))
+        assert calls == 1
+        assert all(r == {"value": 1} for r in results)
+
+    async def test_concurrent_misses_share_errors(self):
+        """Waiters on an in-flight fetch should receive its exception."""
+        cache = TTLCache(ttl=60)
+        calls = 0
+
+        async def fail():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("key", fail) for _ in range(3)),
+            return_exceptions=True,
+        )
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_errors_are_not_cached(self):
+        """A failed fetch should not populate the cache."""
+        cache = TTLCache(ttl=60)
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("key", fail)
+        assert cache.get("key") is None
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        """Cancelling the caller that started a fetch should not fail other waiters."""
+        cache = TTLCache(ttl=60)
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "value"
+
+        leader = asyncio.create_task(cache.get_or_fetch("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch("key", fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await waiter == "value"
+        assert leader.cancelled()
+        assert cache.get("key") == "value"
+
+    async def test_fetch_cancelled_when_all_callers_cancel(self):
+        """The shared fetch should be cancelled once no caller is waiting on it."""
+        cache = TTLCache(ttl=60)
+        fetch_cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                fetch_cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(cache.get_or_fetch("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+
+        await asyncio.wait_for(fetch_cancelled.wait(), timeout=1)
+        assert cache.get("key") is None
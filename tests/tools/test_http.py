@@ -0,0 +1,138 @@
+"""Tests for the shared HTTP client helper."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from tools import _http
+from tools._http import (
+    FBI_API_BASE,
+    UCR_API_BASE,
+    aclose_client,
+    get_client,
+    prewarm_clients,
+    revalidating_get,
+    with_retry,
+)
+
+
+@pytest.fixture(autouse=True)
+async def reset_client():
+    """Start and finish each test without a shared client."""
+    await aclose_client()
+    yield
+    await aclose_client()
+
+
+async def test_get_client_is_reused():
+    """Repeated calls should return the same pooled client."""
+    client = get_client()
+    assert get_client() is client
+    assert str(client.base_url).rstrip("/") == UCR_API_BASE
+
+
+async def test_get_client_requests_compression():
+    """Shared clients should ask for gzip/brotli-compressed responses."""
+    assert get_client().headers["Accept-Encoding"] == "gzip, br"
+
+
+async def test_get_client_recreated_after_close():
+    """A closed client should be replaced on next use."""
+    client = get_client()
+    await aclose_client()
+    assert not _http._CLIENTS
+
+    new_client = get_client()
+    assert new_client is not client
+    assert not new_client.is_closed
+
+
+async def test_get_client_per_base_url():
+    """Each base URL should get its own pooled client."""
+    other_base = "https://api.example.test/v1"
+    client = get_client()
+    other = get_client(other_base)
+
+    assert other is not client
+    assert get_client(other_base) is other
+    assert str(other.base_url).rstrip("/") == other_base
+
+
+async def test_prewarm_touches_each_upstream():
+    """Startup prewarm should connect to both hosts and ignore failures."""
+    with patch.object(
+        httpx.AsyncClient, "head", new=AsyncMock(side_effect=httpx.ConnectError("down"))
+    ) as head:
+        await prewarm_clients()
+
+    assert head.await_count == 2
+    assert set(_http._CLIENTS) == {UCR_API_BASE, FBI_API_BASE}
+
+
+def _status_error(
+    status_code: int, headers: dict | None = None
+) -> httpx.HTTPStatusError:
+    """Build an HTTPStatusError for the given status code."""
+    request = httpx.Request("GET", UCR_API_BASE)
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+async def test_with_retry_recovers_from_timeout():
+    """A transient timeout should be retried and the later result returned."""
+    request = AsyncMock(side_effect=[httpx.ReadTimeout("slow"), {"ok": True}])
+    with patch("tools._http.asyncio.sleep", new=AsyncMock()) as sleep:
+        assert await with_retry(request) == {"ok": True}
+    assert request.await_count == 2
+    sleep.assert_awaited_once()
+
+
+async def test_with_retry_honours_retry_after():
+    """429 responses should wait for the Retry-After interval."""
+    request = AsyncMock(side_effect=[_status_error(429, {"Retry-After": "2"}), "done"])
+    with patch("tools._http.asyncio.sleep", new=AsyncMock()) as sleep:
+        assert await with_retry(request) == "done"
+    sleep.assert_awaited_once_with(2.0)
+
+
+async def test_with_retry_does_not_retry_client_errors():
+    """Non-transient status codes should be raised immediately."""
+    request = AsyncMock(side_effect=_status_error(404))
+    with (
+        patch("tools._http.asyncio.sleep", new=AsyncMock()) as sleep,
+        pytest.raises(httpx.HTTPStatusError),
+    ):
+        await with_retry(request)
+    assert request.await_count == 1
+    sleep.assert_not_awaited()
+
+
+async def test_with_retry_gives_up_after_attempts():
+    """The last error should propagate once all attempts are used."""
+    request = AsyncMock(side_effect=_status_error(503))
+    with (
+        patch("tools._http.asyncio.sleep", new=AsyncMock()),
+        pytest.raises(httpx.HTTPStatusError),
+    ):
+        await with_retry(request, attempts=3)
+    assert request.await_count == 3
+
+
+async def test_revalidating_get_reuses_body_on_304():
+    """A 304 answer should return the previously parsed body unchanged."""
+    request = httpx.Request("GET", "https://example.test/models")
+    fresh = httpx.Response(
+        200, json={"v": 1}, headers={"ETag": '"abc"'}, request=request
+    )
+    not_modified = httpx.Response(304, request=request)
+    client = AsyncMock()
+    client.get.side_effect = [fresh, not_modified]
+    key = ("test", "revalidate")
+
+    first = await revalidating_get(client, "/models", key)
+    second = await revalidating_get(client, "/models", key)
+
+    assert first == second == {"v": 1}
+    assert client.get.call_args_list[0][1]["headers"] is None
+    assert client.get.call_args_list[1][1]["headers"] == {"If-None-Match": '"abc"'}
@@ -1,15 +1,24 @@
 """Tests for ucr_compare tool."""
 
+import asyncio
+import json
+
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch
 import httpx
+import orjson
 
 from fastmcp.exceptions import ToolError
+from tools._http import UCR_API_BASE, aclose_client
 from tools.ucr_compare import (
+    _response_cache,
     ucr_compare,
     normalize_offense,
     format_offense_name,
+    suggest_offense_corrections,
     calculate_percent_change,
+    fetch_all_offense_data,
+    fetch_offense_data,
     format_comparison_output,
     VALID_OFFENSES,
 )
@@ -21,173 +30,29 @@ ucr_compare_fn = ucr_compare.fn
 # --- Fixtures for mock API responses ---
 
 
-@pytest.fixture
-def mock_prediction_violent_crime():
-    """Mock prediction response for violent-crime."""
-    return {
-        "offense": "violent-crime",
-        "predictions": [
-            {"date": "2025-01", "predicted": 85000, "lower": 80000, "upper": 90000},
-            {"date": "2025-02", "predicted": 85100, "lower": 79000, "upper": 91000},
-            {"date": "2025-03", "predicted": 85200, "lower": 78000, "upper": 92000},
-            {"date": "2025-04", "predicted": 85300, "lower": 77000, "upper": 93000},
-            {"date": "2025-05", "predicted": 85400, "lower": 76000, "upper": 94000},
-            {"date": "2025-06", "predicted": 84800, "lower": 75000, "upper": 95000},
-        ],
-        "metadata": {
-            "model_type": "ARIMA",
-            "mape": 9.0,
-            "training_end": "Dec 2024",
-        },
-    }
+@pytest.fixture(autouse=True)
+async def clear_response_cache():
+    """Keep cached responses and the shared client from leaking between tests."""
+    _response_cache.clear()
+    yield
+    _response_cache.clear()
+    await aclose_client()
 
 
 @pytest.fixture
-def mock_history_violent_crime():
-    """Mock history response for violent-crime."""
-    return {
-        "offense": "violent-crime",
-        "data": [
-            {"date": "2024-12", "count": 85000},
-        ],
-    }
-
-
-@pytest.fixture
-def mock_prediction_property_crime():
-    """Mock prediction response for property-crime."""
-    return {
-        "offense": "property-crime",
-        "predictions": [
-            {"date": "2025-01", "predicted": 250000, "lower": 240000, "upper": 260000},
-            {"date": "2025-02", "predicted": 249000, "lower": 238000, "upper": 261000},
-            {"date": "2025-03", "predicted": 248000, "lower": 236000, "upper": 262000},
-            {"date": "2025-04", "predicted": 247000, "lower": 234000, "upper": 263000},
-            {"date": "2025-05", "predicted": 246000, "lower": 232000, "upper": 264000},
-            {"date": "2025-06", "predicted": 245000, "lower": 230000, "upper": 265000},
-        ],
-        "metadata": {
-            "model_type": "ARIMA",
-            "mape": 7.9,
-            "training_end": "Dec 2024",
-        },
-    }
-
-
-@pytest.fixture
-def mock_history_property_crime():
-    """Mock history response for property-crime."""
-    return {
-        "offense": "property-crime",
-        "data": [
-            {"date": "2024-12", "count": 250000},
-        ],
-    }
-
-
-@pytest.fixture
-def mock_prediction_homicide():
-    """Mock prediction response for homicide."""
-    return {
-        "offense": "homicide",
-        "predictions": [
-            {"date": "2025-01", "predicted": 1500, "lower": 1400, "upper": 1600},
-            {"date": "2025-02", "predicted": 1480, "lower": 1350, "upper": 1610},
-            {"date": "2025-03", "predicted": 1460, "lower": 1300, "upper": 1620},
-            {"date": "2025-04", "predicted": 1440, "lower": 1250, "upper": 1630},
-            {"date": "2025-05", "predicted": 1420, "lower": 1200, "upper": 1640},
-            {"date": "2025-06", "predicted": 1400, "lower": 1150, "upper": 1650},
-        ],
-        "metadata": {
-            "model_type": "Prophet",
-            "mape": 8.2,
-            "training_end": "Dec 2024",
-        },
-    }
-
-
-@pytest.fixture
-def mock_history_homicide():
-    """Mock history response for homicide."""
-    return {
-        "offense": "homicide",
-        "data": [
-            {"date": "2024-12", "count": 1500},
-        ],
-    }
-
-
-@pytest.fixture
-def mock_prediction_burglary():
-    """Mock prediction response for burglary."""
-    return {
-        "offense": "burglary",
-        "predictions": [
-            {"date": "2025-01", "predicted": 100000, "lower": 95000, "upper": 105000},
-            {"date": "2025-02", "predicted": 99000, "lower": 93000, "upper": 106000},
-            {"date": "2025-03", "predicted": 98000, "lower": 91000, "upper": 107000},
-            {"date": "2025-04", "predicted": 97000, "lower": 89000, "upper": 108000},
-            {"date": "2025-05", "predicted": 96000, "lower": 87000, "upper": 109000},
-            {"date": "2025-06", "predicted": 95000, "lower": 85000, "upper": 110000},
-        ],
-        "metadata": {
-            "model_type": "ARIMA",
-            "mape": 7.7,
-            "training_end": "Dec 2024",
-        },
-    }
-
-
-@pytest.fixture
-def mock_history_burglary():
-    """Mock history response for burglary."""
-    return {
-        "offense": "burglary",
-        "data": [
-            {"date": "2024-12", "count": 100000},
-        ],
-    }
-
-
-@pytest.fixture
-def mock_prediction_mvt():
-    """Mock prediction response for motor-vehicle-theft with significant increase."""
-    return {
-        "offense": "motor-vehicle-theft",
-        "predictions": [
-            {"date": "2025-01", "predicted": 72000, "lower": 68000, "upper": 76000},
-            {"date": "2025-02", "predicted": 74000, "lower": 69000, "upper": 79000},
-            {"date": "2025-03", "predicted": 76000, "lower": 70000, "upper": 82000},
-            {"date": "2025-04", "predicted": 78000, "lower": 71000, "upper": 85000},
-            {"date": "2025-05", "predicted": 80000, "lower": 72000, "upper": 88000},
-            {"date": "2025-06", "predicted": 83822, "lower": 73000, "upper": 95000},
-        ],
-        "metadata": {
-            "model_type": "SARIMA",
-            "mape": 5.4,
-            "training_end": "Dec 2024",
-        },
-    }
-
-
-@pytest.fixture
-def mock_history_mvt():
-    """Mock history response for motor-vehicle-theft."""
-    return {
-        "offense": "motor-vehicle-theft",
-        "data": [
-            {"date": "2024-12", "count": 70000},
-        ],
-    }
+def serve_backend(respx_mock):
+    """Register backend routes on respx; requests go through the real shared client."""
 
+    def serve(*offenses):
+        for offense, prediction, history in offenses:
+            respx_mock.post(f"/api/v1/predict/{offense}").mock(
+                return_value=httpx.Response(200, json=prediction)
+            )
+            respx_mock.get(f"/api/v1/history/{offense}").mock(
+                return_value=httpx.Response(200, json=history)
+            )
 
-def create_mock_response(json_data):
-    """Create a mock httpx response."""
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = json_data
-    mock_response.raise_for_status = MagicMock()
-    return mock_response
+    return serve
 
 
 # --- Unit Tests for Helper Functions ---
@@ -201,36 +66,27 @@ class TestNormalizeOffense:
         for offense in VALID_OFFENSES:
             assert normalize_offense(offense) == offense
 
-    def test_alias_violent(self):
-        """Test violent crime aliases."""
-        assert normalize_offense("violent") == "violent-crime"
-        assert normalize_offense("violent crime") == "violent-crime"
-        assert normalize_offense("violent_crime") == "violent-crime"
-
-    def test_alias_property(self):
-        """Test property crime aliases."""
-        assert normalize_offense("property") == "property-crime"
-        assert normalize_offense("property crime") == "property-crime"
-        assert normalize_offense("property_crime") == "property-crime"
-
-    def test_alias_homicide(self):
-        """Test homicide aliases."""
-        assert normalize_offense("murder") == "homicide"
-
-    def test_alias_mvt(self):
-        """Test motor vehicle theft aliases."""
-        assert normalize_offense("mvt") == "motor-vehicle-theft"
-        assert normalize_offense("vehicle theft") == "motor-vehicle-theft"
-        assert normalize_offense("car theft") == "motor-vehicle-theft"
-
-    def test_case_insensitive(self):
-        """Test that normalization is case insensitive."""
-        assert normalize_offense("VIOLENT-CRIME") == "violent-crime"
-        assert normalize_offense("Property-Crime") == "property-crime"
-
-    def test_strips_whitespace(self):
-        """Test that whitespace is stripped."""
-        assert normalize_offense("  homicide  ") == "homicide"
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("violent", "violent-crime"),
+            ("violent crime", "violent-crime"),
+            ("violent_crime", "violent-crime"),
+            ("property", "property-crime"),
+            ("property crime", "property-crime"),
+            ("property_crime", "property-crime"),
+            ("murder", "homicide"),
+            ("mvt", "motor-vehicle-theft"),
+            ("vehicle theft", "motor-vehicle-theft"),
+            ("car theft", "motor-vehicle-theft"),
+            ("VIOLENT-CRIME", "violent-crime"),
+            ("Property-Crime", "property-crime"),
+            ("  homicide  ", "homicide"),
+        ],
+    )
+    def test_aliases_case_and_whitespace(self, raw, expected):
+        """Test aliases, case-insensitivity and whitespace stripping."""
+        assert normalize_offense(raw) == expected
 
     def test_invalid_offense_raises(self):
         """Test that invalid offenses raise ValueError."""
@@ -241,83 +97,85 @@ class TestNormalizeOffense:
 class TestFormatOffenseName:
     """Tests for format_offense_name function."""
 
-    def test_formats_correctly(self):
+    @pytest.mark.parametrize(
+        "offense,expected",
+        [
+            ("violent-crime", "Violent Crime"),
+            ("property-crime", "Property Crime"),
+            ("motor-vehicle-theft", "Motor Vehicle Theft"),
+            ("homicide", "Homicide"),
+            ("burglary", "Burglary"),
+        ],
+    )
+    def test_formats_correctly(self, offense, expected):
         """Test offense name formatting."""
-        assert format_offense_name("violent-crime") == "Violent Crime"
-        assert format_offense_name("property-crime") == "Property Crime"
-        assert format_offense_name("motor-vehicle-theft") == "Motor Vehicle Theft"
-        assert format_offense_name("homicide") == "Homicide"
-        assert format_offense_name("burglary") == "Burglary"
+        assert format_offense_name(offense) == expected
 
 
-class TestCalculatePercentChange:
-    """Tests for calculate_percent_change function."""
+class TestSuggestOffenseCorrections:
+    """Tests for suggest_offense_corrections function."""
 
-    def test_positive_change(self):
-        """Test positive percent change."""
-        assert calculate_percent_change(100, 110) == 10.0
+    def test_underscore_suggestion(self):
+        """Test that underscores are suggested as hyphens."""
+        assert suggest_offense_corrections(["Motor_Vehicle_Theft"]) == [
+            '"Motor_Vehicle_Theft" -> Did you mean "motor-vehicle-theft"?'
+        ]
 
-    def test_negative_change(self):
-        """Test negative percent change."""
-        assert calculate_percent_change(100, 90) == -10.0
+    def test_unrecognized(self):
+        """Test that unknown offenses are reported as not recognized."""
+        assert suggest_offense_corrections(["arson"]) == ['"arson" is not recognized']
 
-    def test_no_change(self):
-        """Test no percent change."""
-        assert calculate_percent_change(100, 100) == 0.0
 
-    def test_zero_current(self):
-        """Test with zero current value."""
-        assert calculate_percent_change(0, 0) == 0.0
-        assert calculate_percent_change(0, 100) == float("inf")
+class TestCalculatePercentChange:
+    """Tests for calculate_percent_change function."""
+
+    @pytest.mark.parametrize(
+        "current,forecast,expected",
+        [
+            (100, 110, 10.0),
+            (100, 90, -10.0),
+            (100, 100, 0.0),
+            (0, 0, 0.0),
+            (0, 100, float("inf")),
+        ],
+    )
+    def test_percent_change(self, current, forecast, expected):
+        """Test positive, negative, zero and zero-baseline changes."""
+        assert calculate_percent_change(current, forecast) == expected
 
 
 # --- Integration Tests with Mocked HTTP ---
 
 
-@pytest.mark.asyncio
+@pytest.mark.respx(base_url=UCR_API_BASE)
 async def test_ucr_compare_two_offenses(
     mock_prediction_violent_crime,
     mock_history_violent_crime,
     mock_prediction_property_crime,
     mock_history_property_crime,
+    serve_backend,
 ):
     """Test comparing 2 offenses."""
-
-    def route_request(url, **kwargs):
-        """Route mock request based on URL."""
-        if "predict/violent-crime" in url:
-            return create_mock_response(mock_prediction_violent_crime)
-        elif "history/violent-crime" in url:
-            return create_mock_response(mock_history_violent_crime)
-        elif "predict/property-crime" in url:
-            return create_mock_response(mock_prediction_property_crime)
-        elif "history/property-crime" in url:
-            return create_mock_response(mock_history_property_crime)
-        raise ValueError(f"Unexpected URL: {url}")
-
-    with patch("tools.ucr_compare.httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
-        mock_client.__aexit__.return_value = None
-        mock_client.post.side_effect = route_request
-        mock_client.get.side_effect = route_request
-        mock_client_class.return_value = mock_client
-
-        result = await ucr_compare_fn(
-            offenses=["violent-crime", "property-crime"],
-            months_ahead=6,
-            metric="percent_change",
-        )
-
-        # Verify output contains expected elements
-        assert "Crime Trend Comparison (6-month forecast):" in result
-        assert "Violent Crime" in result
-        assert "Property Crime" in result
-        assert "ARIMA" in result
-        assert "Dec 2024" in result
-
-
-@pytest.mark.asyncio
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("property-crime", mock_prediction_property_crime, mock_history_property_crime),
+    )
+
+    result = await ucr_compare_fn(
+        offenses=["violent-crime", "property-crime"],
+        months_ahead=6,
+        metric="percent_change",
+    )
+
+    # Verify output contains expected elements
+    assert "Crime Trend Comparison - National (6-month forecast):" in result
+    assert "Violent Crime" in result
+    assert "Property Crime" in result
+    assert "ARIMA" in result
+    assert "Dec 2024" in result
+
+
+@pytest.mark.respx(base_url=UCR_API_BASE)
 async def test_ucr_compare_five_offenses(
     mock_prediction_violent_crime,
     mock_history_violent_crime,
@@ -329,167 +187,100 @@ async def test_ucr_compare_five_offenses(
     mock_history_burglary,
     mock_prediction_mvt,
     mock_history_mvt,
+    serve_backend,
 ):
     """Test comparing 5 offenses (maximum)."""
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("property-crime", mock_prediction_property_crime, mock_history_property_crime),
+        ("homicide", mock_prediction_homicide, mock_history_homicide),
+        ("burglary", mock_prediction_burglary, mock_history_burglary),
+        ("motor-vehicle-theft", mock_prediction_mvt, mock_history_mvt),
+    )
+
+    result = await ucr_compare_fn(
+        offenses=[
+            "violent-crime",
+            "property-crime",
+            "homicide",
+            "burglary",
+            "motor-vehicle-theft",
+        ],
+        months_ahead=6,
+        metric="percent_change",
+    )
 
-    def route_request(url, **kwargs):
-        """Route mock request based on URL."""
-        if "predict/violent-crime" in url:
-            return create_mock_response(mock_prediction_violent_crime)
-        elif "history/violent-crime" in url:
-            return create_mock_response(mock_history_violent_crime)
-        elif "predict/property-crime" in url:
-            return create_mock_response(mock_prediction_property_crime)
-        elif "history/property-crime" in url:
-            return create_mock_response(mock_history_property_crime)
-        elif "predict/homicide" in url:
-            return create_mock_response(mock_prediction_homicide)
-        elif "history/homicide" in url:
-            return create_mock_response(mock_history_homicide)
-        elif "predict/burglary" in url:
-            return create_mock_response(mock_prediction_burglary)
-        elif "history/burglary" in url:
-            return create_mock_response(mock_history_burglary)
-        elif "predict/motor-vehicle-theft" in url:
-            return create_mock_response(mock_prediction_mvt)
-        elif "history/motor-vehicle-theft" in url:
-            return create_mock_response(mock_history_mvt)
-        raise ValueError(f"Unexpected URL: {url}")
-
-    with patch("tools.ucr_compare.httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
-        mock_client.__aexit__.return_value = None
-        mock_client.post.side_effect = route_request
-        mock_client.get.side_effect = route_request
-        mock_client_class.return_value = mock_client
-
-        result = await ucr_compare_fn(
-            offenses=[
-                "violent-crime",
-                "property-crime",
-                "homicide",
-                "burglary",
-                "motor-vehicle-theft",
-            ],
-            months_ahead=6,
-            metric="percent_change",
-        )
-
-        # Verify output contains all offenses
-        assert "Violent Crime" in result
-        assert "Property Crime" in result
-        assert "Homicide" in result
-        assert "Burglary" in result
-        assert "Motor Vehicle Theft" in result
+    # Verify output contains all offenses
+    assert "Violent Crime" in result
+    assert "Property Crime" in result
+    assert "Homicide" in result
+    assert "Burglary" in result
+    assert "Motor Vehicle Theft" in result
 
-        # Motor vehicle theft has >10% increase, should show warning
-        assert "\u26a0\ufe0f" in result or "warning" in result.lower()
+    # Motor vehicle theft has >10% increase, should show warning
+    assert "\u26a0\ufe0f" in result or "warning" in result.lower()
 
 
-@pytest.mark.asyncio
+@pytest.mark.respx(base_url=UCR_API_BASE)
 async def test_ucr_compare_absolute_metric(
     mock_prediction_violent_crime,
     mock_history_violent_crime,
     mock_prediction_property_crime,
     mock_history_property_crime,
+    serve_backend,
 ):
     """Test with absolute metric (no percent change column)."""
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("property-crime", mock_prediction_property_crime, mock_history_property_crime),
+    )
 
-    def route_request(url, **kwargs):
-        """Route mock request based on URL."""
-        if "predict/violent-crime" in url:
-            return create_mock_response(mock_prediction_violent_crime)
-        elif "history/violent-crime" in url:
-            return create_mock_response(mock_history_violent_crime)
-        elif "predict/property-crime" in url:
-            return create_mock_response(mock_prediction_property_crime)
-        elif "history/property-crime" in url:
-            return create_mock_response(mock_history_property_crime)
-        raise ValueError(f"Unexpected URL: {url}")
-
-    with patch("tools.ucr_compare.httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
-        mock_client.__aexit__.return_value = None
-        mock_client.post.side_effect = route_request
-        mock_client.get.side_effect = route_request
-        mock_client_class.return_value = mock_client
-
-        result = await ucr_compare_fn(
-            offenses=["violent-crime", "property-crime"],
-            months_ahead=6,
-            metric="absolute",
-        )
+    result = await ucr_compare_fn(
+        offenses=["violent-crime", "property-crime"],
+        months_ahead=6,
+        metric="absolute",
+    )
 
-        # Should NOT contain Change column header for absolute metric
-        assert "Change" not in result.split("\n")[2]  # Header row
-        assert "Current" in result
-        assert "Forecast" in result
+    # Should NOT contain Change column header for absolute metric
+    assert "Change" not in result.split("\n")[2]  # Header row
+    assert "Current" in result
+    assert "Forecast" in result
 
 
-@pytest.mark.asyncio
+@pytest.mark.respx(base_url=UCR_API_BASE)
 async def test_ucr_compare_with_significant_change_warning(
     mock_prediction_violent_crime,
     mock_history_violent_crime,
     mock_prediction_mvt,
     mock_history_mvt,
+    serve_backend,
 ):
     """Test that significant changes (>10%) show warning."""
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("motor-vehicle-theft", mock_prediction_mvt, mock_history_mvt),
+    )
 
-    def route_request(url, **kwargs):
-        """Route mock request based on URL."""
-        if "predict/violent-crime" in url:
-            return create_mock_response(mock_prediction_violent_crime)
-        elif "history/violent-crime" in url:
-            return create_mock_response(mock_history_violent_crime)
-        elif "predict/motor-vehicle-theft" in url:
-            return create_mock_response(mock_prediction_mvt)
-        elif "history/motor-vehicle-theft" in url:
-            return create_mock_response(mock_history_mvt)
-        raise ValueError(f"Unexpected URL: {url}")
-
-    with patch("tools.ucr_compare.httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
-        mock_client.__aexit__.return_value = None
-        mock_client.post.side_effect = route_request
-        mock_client.get.side_effect = route_request
-        mock_client_class.return_value = mock_client
-
-        result = await ucr_compare_fn(
-            offenses=["violent-crime", "motor-vehicle-theft"],
-            months_ahead=6,
-            metric="percent_change",
-        )
+    result = await ucr_compare_fn(
+        offenses=["violent-crime", "motor-vehicle-theft"],
+        months_ahead=6,
+        metric="percent_change",
+    )
 
-        # Motor vehicle theft has >10% increase (70000 -> 83822 = +19.7%)
-        assert "Motor Vehicle Theft shows significant projected increase" in result
+    # Motor vehicle theft has >10% increase (70000 -> 83822 = +19.7%)
+    assert "Motor Vehicle Theft shows significant projected increase" in result
 
 
 # --- Error Handling Tests ---
 
 
-@pytest.mark.asyncio
-async def test_ucr_compare_too_few_offenses():
-    """Test error when less than 2 offenses provided."""
-    with pytest.raises(ToolError) as exc_info:
-        await ucr_compare_fn(
-            offenses=["violent-crime"],
-            months_ahead=6,
-            metric="percent_change",
-        )
-
-    assert "At least 2 offenses are required" in str(exc_info.value)
-    assert "You provided 1" in str(exc_info.value)
-
-
-@pytest.mark.asyncio
-async def test_ucr_compare_too_many_offenses():
-    """Test error when more than 5 offenses provided."""
-    with pytest.raises(ToolError) as exc_info:
-        await ucr_compare_fn(
-            offenses=[
+@pytest.mark.parametrize(
+    "offenses,pattern",
+    [
+        (["violent-crime"], r"At least 2 offenses are required.*You provided 1"),
+        ([], r"At least 2 offenses are required.*You provided 0"),
+        (
+            [
                 "violent-crime",
                 "property-crime",
                 "homicide",
@@ -497,124 +288,326 @@ async def test_ucr_compare_too_many_offenses():
                 "motor-vehicle-theft",
                 "violent-crime",  # 6th offense
             ],
+            r"Maximum 5 offenses.*You provided 6",
+        ),
+        (
+            ["violent-crime", "invalid-offense"],
+            r'(?s)Invalid offense\(s\).*"invalid-offense" is not recognized',
+        ),
+        # burglary_crime has no alias, so it gets the underscore suggestion
+        (
+            ["violent-crime", "burglary_crime"],
+            r"(?s)is not recognized.*Use hyphens, not underscores",
+        ),
+    ],
+    ids=["too-few", "empty", "too-many", "invalid", "underscore"],
+)
+async def test_ucr_compare_validation_errors(offenses, pattern):
+    """Test that invalid offense lists are rejected before any request."""
+    with pytest.raises(ToolError, match=pattern):
+        await ucr_compare_fn(
+            offenses=offenses,
             months_ahead=6,
             metric="percent_change",
         )
 
-    assert "Maximum 5 offenses" in str(exc_info.value)
-    assert "You provided 6" in str(exc_info.value)
 
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_ucr_compare_api_unavailable(respx_mock):
+    """Test error handling when API is unavailable."""
+    respx_mock.route().mock(side_effect=httpx.ConnectError("Connection refused"))
 
-@pytest.mark.asyncio
-async def test_ucr_compare_empty_offenses_list():
-    """Test error when empty offenses list provided."""
-    with pytest.raises(ToolError) as exc_info:
+    with pytest.raises(ToolError, match=r"temporarily unavailable"):
         await ucr_compare_fn(
-            offenses=[],
+            offenses=["violent-crime", "property-crime"],
             months_ahead=6,
             metric="percent_change",
         )
 
-    assert "At least 2 offenses are required" in str(exc_info.value)
-    assert "You provided 0" in str(exc_info.value)
-
 
-@pytest.mark.asyncio
-async def test_ucr_compare_invalid_offense():
-    """Test error when invalid offense is in the list."""
-    with pytest.raises(ToolError) as exc_info:
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_ucr_compare_offense_aliases(
+    mock_prediction_violent_crime,
+    mock_history_violent_crime,
+    mock_prediction_property_crime,
+    mock_history_property_crime,
+    serve_backend,
+):
+    """Test that offense aliases work correctly."""
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("property-crime", mock_prediction_property_crime, mock_history_property_crime),
+    )
+
+    # Use aliases instead of canonical names
+    result = await ucr_compare_fn(
+        offenses=["violent", "property"],  # aliases
+        months_ahead=6,
+        metric="percent_change",
+    )
+
+    # Should work and show proper names
+    assert "Violent Crime" in result
+    assert "Property Crime" in result
+
+
+async def test_ucr_compare_rejects_aliases_of_one_offense(respx_mock):
+    """Test that aliases of the same offense don't count as a comparison."""
+    with pytest.raises(
+        ToolError,
+        match=r"At least 2 offenses are required.*all name the same offense",
+    ):
         await ucr_compare_fn(
-            offenses=["violent-crime", "invalid-offense"],
+            offenses=["violent-crime", "violent"],
             months_ahead=6,
             metric="percent_change",
+            state=None,
         )
 
-    assert "Invalid offense(s)" in str(exc_info.value)
-    assert '"invalid-offense" is not recognized' in str(exc_info.value)
+    assert respx_mock.calls.call_count == 0
+
 
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_ucr_compare_dedupes_aliased_offenses(
+    mock_prediction_violent_crime,
+    mock_history_violent_crime,
+    mock_prediction_property_crime,
+    mock_history_property_crime,
+    respx_mock,
+    serve_backend,
+):
+    """Test that aliases of the same offense are fetched and shown once."""
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("property-crime", mock_prediction_property_crime, mock_history_property_crime),
+    )
 
-@pytest.mark.asyncio
-async def test_ucr_compare_underscore_suggestion():
-    """Test that underscore offense names get helpful suggestion."""
-    # Note: violent_crime and property_crime are aliases that work
-    # Let's test with an underscore name that doesn't have an alias
-    with pytest.raises(ToolError) as exc_info:
+    result = await ucr_compare_fn(
+        offenses=["violent-crime", "violent", "property-crime"],
+        months_ahead=6,
+        metric="percent_change",
+        state=None,
+    )
+
+    assert respx_mock.calls.call_count == 4  # one prediction + one history each
+    assert result.count("Violent Crime") == 1
+
+
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_ucr_compare_valid_offenses_skip_suggestions(
+    mock_prediction_violent_crime,
+    mock_history_violent_crime,
+    mock_prediction_property_crime,
+    mock_history_property_crime,
+    serve_backend,
+):
+    """Test that the suggestion builder only runs on the error path."""
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("property-crime", mock_prediction_property_crime, mock_history_property_crime),
+    )
+
+    with patch("tools.ucr_compare.suggest_offense_corrections") as suggest:
         await ucr_compare_fn(
-            offenses=["violent-crime", "burglary_crime"],  # burglary_crime isn't an alias
+            offenses=["violent", "property-crime"],
             months_ahead=6,
             metric="percent_change",
+            state=None,
         )
 
-    error_msg = str(exc_info.value)
-    assert "is not recognized" in error_msg
-    assert "Use hyphens, not underscores" in error_msg
+    suggest.assert_not_called()
 
 
-@pytest.mark.asyncio
-async def test_ucr_compare_api_unavailable():
-    """Test error handling when API is unavailable."""
+# --- Batch Endpoint Tests ---
 
-    def raise_connect_error(url, **kwargs):
-        """Raise connection error for any request."""
-        raise httpx.ConnectError("Connection refused")
-
-    with patch("tools.ucr_compare.httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
-        mock_client.__aexit__.return_value = None
-        mock_client.post.side_effect = raise_connect_error
-        mock_client.get.side_effect = raise_connect_error
-        mock_client_class.return_value = mock_client
-
-        with pytest.raises(ToolError) as exc_info:
-            await ucr_compare_fn(
-                offenses=["violent-crime", "property-crime"],
-                months_ahead=6,
-                metric="percent_change",
-            )
 
-        assert "temporarily unavailable" in str(exc_info.value)
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_batch_endpoint_used_when_enabled(
+    mock_prediction_violent_crime,
+    mock_history_violent_crime,
+    mock_prediction_property_crime,
+    mock_history_property_crime,
+    respx_mock,
+):
+    """Test that the batch endpoint replaces per-offense requests when enabled."""
+    batch_route = respx_mock.post("/api/v1/compare").respond(
+        200,
+        json={
+            "results": [
+                {
+                    "offense": "violent-crime",
+                    "prediction": mock_prediction_violent_crime,
+                    "history": mock_history_violent_crime,
+                    "error": None,
+                },
+                {
+                    "offense": "property-crime",
+                    "prediction": mock_prediction_property_crime,
+                    "history": mock_history_property_crime,
+                    "error": None,
+                },
+            ]
+        },
+    )
 
+    with patch("tools.ucr_compare.USE_BATCH_ENDPOINT", True):
+        results = await fetch_all_offense_data(["violent-crime", "property-crime"], 6)
 
-@pytest.mark.asyncio
-async def test_ucr_compare_offense_aliases(
+    assert batch_route.call_count == 1
+    assert respx_mock.calls.call_count == 1  # no per-offense requests
+    assert [r[0] for r in results] == ["violent-crime", "property-crime"]
+    assert results[0][1] == mock_prediction_violent_crime
+    assert all(r[3] is None for r in results)
+
+
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_batch_endpoint_falls_back_on_404(
     mock_prediction_violent_crime,
     mock_history_violent_crime,
     mock_prediction_property_crime,
     mock_history_property_crime,
+    respx_mock,
+    serve_backend,
 ):
-    """Test that offense aliases work correctly."""
+    """Test fallback to per-offense requests when the batch endpoint is missing."""
+    batch_route = respx_mock.post("/api/v1/compare").mock(
+        return_value=httpx.Response(404)
+    )
+    serve_backend(
+        ("violent-crime", mock_prediction_violent_crime, mock_history_violent_crime),
+        ("property-crime", mock_prediction_property_crime, mock_history_property_crime),
+    )
+
+    with patch("tools.ucr_compare.USE_BATCH_ENDPOINT", True):
+        results = await fetch_all_offense_data(["violent-crime", "property-crime"], 6)
+
+    assert batch_route.call_count == 1
+    assert respx_mock.calls.call_count == 5  # batch attempt + 2 predictions + 2 histories
+    assert results[1][1] == mock_prediction_property_crime
+    assert all(r[3] is None for r in results)
+
+
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_batch_endpoint_requests_only_uncached_offenses(
+    mock_prediction_violent_crime,
+    mock_history_violent_crime,
+    mock_prediction_property_crime,
+    mock_history_property_crime,
+    respx_mock,
+):
+    """Test that cached offenses are served locally and left out of the batch."""
+    _response_cache.set(
+        ("predict", "violent-crime", 6, None), mock_prediction_violent_crime
+    )
+    _response_cache.set(
+        ("history", "violent-crime", 1, None), mock_history_violent_crime
+    )
+    batch_route = respx_mock.post("/api/v1/compare").respond(
+        200,
+        json={
+            "results": [
+                {
+                    "offense": "property-crime",
+                    "prediction": mock_prediction_property_crime,
+                    "history": mock_history_property_crime,
+                    "error": None,
+                },
+            ]
+        },
+    )
+
+    with patch("tools.ucr_compare.USE_BATCH_ENDPOINT", True):
+        results = await fetch_all_offense_data(["violent-crime", "property-crime"], 6)
+        assert json.loads(batch_route.calls.last.request.content)["offenses"] == [
+            "property-crime"
+        ]
+
+        # Everything is cached now, so a repeat comparison makes no request
+        await fetch_all_offense_data(["violent-crime", "property-crime"], 6)
+
+    assert batch_route.call_count == 1
+    assert results[0][1] == mock_prediction_violent_crime
+    assert results[1][1] == mock_prediction_property_crime
+    assert all(r[3] is None for r in results)
 
-    def route_request(url, **kwargs):
-        """Route mock request based on URL."""
-        if "predict/violent-crime" in url:
-            return create_mock_response(mock_prediction_violent_crime)
-        elif "history/violent-crime" in url:
-            return create_mock_response(mock_history_violent_crime)
-        elif "predict/property-crime" in url:
-            return create_mock_response(mock_prediction_property_crime)
-        elif "history/property-crime" in url:
-            return create_mock_response(mock_history_property_crime)
-        raise ValueError(f"Unexpected URL: {url}")
-
-    with patch("tools.ucr_compare.httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
-        mock_client.__aexit__.return_value = None
-        mock_client.post.side_effect = route_request
-        mock_client.get.side_effect = route_request
-        mock_client_class.return_value = mock_client
-
-        # Use aliases instead of canonical names
-        result = await ucr_compare_fn(
-            offenses=["violent", "property"],  # aliases
-            months_ahead=6,
-            metric="percent_change",
-        )
 
-        # Should work and show proper names
-        assert "Violent Crime" in result
-        assert "Property Crime" in result
+@pytest.mark.respx(base_url=UCR_API_BASE)
+async def test_batch_endpoint_retries_transient_errors(
+    mock_prediction_violent_crime,
+    mock_history_violent_crime,
+    respx_mock,
+):
+    """Test that a transient 503 on the batch endpoint is retried."""
+    batch_route = respx_mock.post("/api/v1/compare").mock(
+        side_effect=[
+            httpx.Response(503),
+            httpx.Response(
+                200,
+                json={
+                    "results": [
+                        {
+                            "offense": "violent-crime",
+                            "prediction": mock_prediction_violent_crime,
+                            "history": mock_history_violent_crime,
+                            "error": None,
+                        },
+                    ]
+                },
+            ),
+        ]
+    )
+
+    with (
+        patch("tools.ucr_compare.USE_BATCH_ENDPOINT", True),
+        patch("tools._http.asyncio.sleep", new=AsyncMock()),
+    ):
+        results = await fetch_all_offense_data(["violent-crime"], 6)
+
+    assert batch_route.call_count == 2
+    assert respx_mock.calls.call_count == 2  # no per-offense fallback
+    assert results[0][1] == mock_prediction_violent_crime
+
+
+async def test_fetch_offense_data_cancels_sibling_on_error(make_response):
+    """Test that a failed prediction cancels the still-running history request."""
+    server_error = make_response(status_code=500)
+    history_cancelled = asyncio.Event()
+
+    async def slow_history(url, **kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            history_cancelled.set()
+            raise
+
+    mock_client = AsyncMock()
+    mock_client.post.return_value = server_error
+    mock_client.get.side_effect = slow_history
+    with patch("tools.ucr_compare.get_client", return_value=mock_client):
+        result = await asyncio.wait_for(fetch_offense_data("violent-crime", 6), timeout=1)
+
+    assert result == ("violent-crime", None, None, "API error: 500")
+    assert history_cancelled.is_set()
+
+
+@pytest.mark.parametrize("history_status", [200, 500])
+async def test_fetch_offense_data_raises_malformed_body_unwrapped(
+    make_response, mock_history_violent_crime, history_status
+):
+    """Test that a non-HTTP failure propagates as itself, not an ExceptionGroup."""
+    malformed = httpx.Response(
+        200, content=b"<html>", request=httpx.Request("POST", UCR_API_BASE)
+    )
+    mock_client = AsyncMock()
+    mock_client.post.return_value = malformed
+    mock_client.get.return_value = make_response(
+        mock_history_violent_crime, status_code=history_status
+    )
+    with (
+        patch("tools.ucr_compare.get_client", return_value=mock_client),
+        pytest.raises(orjson.JSONDecodeError),
+    ):
+        await fetch_offense_data("violent-crime", 6)
 
 
 # --- Format Output Tests ---
@@ -623,6 +616,31 @@ async def test_ucr_compare_offense_aliases(
 class TestFormatComparisonOutput:
     """Tests for format_comparison_output function."""
 
+    @pytest.mark.parametrize(
+        "offense,fixture_suffix",
+        [
+            ("violent-crime", "violent_crime"),
+            ("property-crime", "property_crime"),
+            ("homicide", "homicide"),
+            ("burglary", "burglary"),
+            ("motor-vehicle-theft", "mvt"),
+        ],
+    )
+    def test_each_offense_formats_from_backend_payloads(
+        self, request, offense, fixture_suffix
+    ):
+        """Each offense's payloads should render a row without any HTTP mocking."""
+        prediction = request.getfixturevalue(f"mock_prediction_{fixture_suffix}")
+        history = request.getfixturevalue(f"mock_history_{fixture_suffix}")
+
+        output = format_comparison_output(
+            [(offense, prediction, history, None)], 6, "percent_change"
+        )
+
+        assert format_offense_name(offense) in output
+        assert prediction["metadata"]["model_type"] in output
+        assert "Error:" not in output
+
     def test_format_with_no_data(self):
         """Test formatting with empty results (all errors)."""
         results = [
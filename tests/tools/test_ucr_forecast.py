@@ -1,13 +1,17 @@
 """Tests for ucr_forecast tool."""
 
-import json
-from unittest.mock import AsyncMock, patch, MagicMock
+import asyncio
+from unittest.mock import AsyncMock, patch
 
 import httpx
+import orjson
 import pytest
 from fastmcp.exceptions import ToolError
 
+from tools._http import UCR_API_BASE
 from tools.ucr_forecast import (
+    _output_cache,
+    _response_cache,
     ucr_forecast,
     normalize_offense,
     format_month,
@@ -17,6 +21,7 @@ from tools.ucr_forecast import (
     format_detailed,
     VALID_OFFENSES,
     OFFENSE_ALIASES,
+    SUMMARY_FIELDS,
 )
 
 # Access the underlying function for testing (FastMCP decorator pattern)
@@ -28,55 +33,45 @@ ucr_forecast_fn = ucr_forecast.fn
 # ============================================================================
 
 
-@pytest.fixture
-def sample_prediction_response():
-    """Sample successful prediction API response."""
-    return {
-        "predictions": [
-            {"date": "2025-01", "predicted": 85000, "lower": 80000, "upper": 90000},
-            {"date": "2025-02", "predicted": 86000, "lower": 81000, "upper": 91000},
-            {"date": "2025-03", "predicted": 87500, "lower": 82000, "upper": 93000},
-        ],
-        "model": {
-            "model_type": "SARIMA",
-            "mape": 3.5,
-            "training_end": "2024-12",
-        },
-    }
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start each test with empty response and output caches."""
+    _response_cache.clear()
+    _output_cache.clear()
+    yield
+    _response_cache.clear()
+    _output_cache.clear()
 
 
 @pytest.fixture
-def sample_history_response():
-    """Sample successful history API response."""
-    return {
-        "history": [
-            {"date": "2024-10", "incidents": 82000},
-            {"date": "2024-11", "incidents": 83500},
-            {"date": "2024-12", "incidents": 84000},
-        ]
-    }
+def mock_httpx_client(
+    sample_prediction_response, sample_history_response, make_response, monkeypatch
+):
+    """Install a mock shared httpx.AsyncClient as the tool's client."""
+    mock_client = AsyncMock()
+    monkeypatch.setattr("tools.ucr_forecast.get_client", lambda: mock_client)
+    mock_client.post = AsyncMock(return_value=make_response(sample_prediction_response))
+    mock_client.get = AsyncMock(return_value=make_response(sample_history_response))
+
+    return mock_client
 
 
 @pytest.fixture
-def mock_httpx_client(sample_prediction_response, sample_history_response):
-    """Create a mock httpx.AsyncClient for testing."""
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = sample_prediction_response
-    mock_response.raise_for_status = MagicMock()
-
-    mock_history_response = MagicMock()
-    mock_history_response.status_code = 200
-    mock_history_response.json.return_value = sample_history_response
-    mock_history_response.raise_for_status = MagicMock()
+async def mock_transport(monkeypatch):
+    """Install a real client whose requests are answered by a handler function."""
+    clients = []
 
-    mock_client = AsyncMock()
-    mock_client.post = AsyncMock(return_value=mock_response)
-    mock_client.get = AsyncMock(return_value=mock_history_response)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    def install(handler):
+        client = httpx.AsyncClient(
+            base_url=UCR_API_BASE, transport=httpx.MockTransport(handler)
+        )
+        clients.append(client)
+        monkeypatch.setattr("tools.ucr_forecast.get_client", lambda: client)
+        return client
 
-    return mock_client
+    yield install
+    for client in clients:
+        await client.aclose()
 
 
 # ============================================================================
@@ -92,32 +87,27 @@ class TestNormalizeOffense:
         for offense in VALID_OFFENSES:
             assert normalize_offense(offense) == offense
 
-    def test_valid_offense_case_insensitive(self):
-        """Offense names should be case-insensitive."""
-        assert normalize_offense("VIOLENT-CRIME") == "violent-crime"
-        assert normalize_offense("Homicide") == "homicide"
-        assert normalize_offense("BURGLARY") == "burglary"
-
-    def test_valid_offense_strips_whitespace(self):
-        """Offense names should be stripped of whitespace."""
-        assert normalize_offense("  violent-crime  ") == "violent-crime"
-        assert normalize_offense("\thomicide\n") == "homicide"
-
-    def test_alias_mapping(self):
-        """Alias mappings should work correctly."""
-        # Underscore to hyphen
-        assert normalize_offense("violent_crime") == "violent-crime"
-        assert normalize_offense("property_crime") == "property-crime"
-        assert normalize_offense("motor_vehicle_theft") == "motor-vehicle-theft"
-
-        # Short names
-        assert normalize_offense("violent") == "violent-crime"
-        assert normalize_offense("property") == "property-crime"
-
-        # Alternative names
-        assert normalize_offense("murder") == "homicide"
-        assert normalize_offense("car-theft") == "motor-vehicle-theft"
-        assert normalize_offense("mvt") == "motor-vehicle-theft"
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("VIOLENT-CRIME", "violent-crime"),
+            ("Homicide", "homicide"),
+            ("BURGLARY", "burglary"),
+            ("  violent-crime  ", "violent-crime"),
+            ("\thomicide\n", "homicide"),
+            ("violent_crime", "violent-crime"),
+            ("property_crime", "property-crime"),
+            ("motor_vehicle_theft", "motor-vehicle-theft"),
+            ("violent", "violent-crime"),
+            ("property", "property-crime"),
+            ("murder", "homicide"),
+            ("car-theft", "motor-vehicle-theft"),
+            ("mvt", "motor-vehicle-theft"),
+        ],
+    )
+    def test_case_whitespace_and_aliases(self, raw, expected):
+        """Case, surrounding whitespace and aliases should normalize."""
+        assert normalize_offense(raw) == expected
 
     def test_invalid_offense_raises_error(self):
         """Invalid offense names should raise ToolError."""
@@ -133,11 +123,9 @@ class TestNormalizeOffense:
 
     def test_invalid_offense_includes_tip(self):
         """Invalid offense error should include helpful tip."""
-        with pytest.raises(ToolError) as exc_info:
+        with pytest.raises(ToolError, match=r"Tip:"):
             normalize_offense("something_wrong")
 
-        assert "Tip:" in str(exc_info.value)
-
 
 # ============================================================================
 # Test format_month function
@@ -147,22 +135,27 @@ class TestNormalizeOffense:
 class TestFormatMonth:
     """Tests for date formatting."""
 
-    def test_yyyy_mm_format(self):
-        """YYYY-MM format should be converted to Mon YYYY."""
-        assert format_month("2025-01") == "Jan 2025"
-        assert format_month("2024-12") == "Dec 2024"
-        assert format_month("2025-06") == "Jun 2025"
-
-    def test_yyyy_mm_dd_format(self):
-        """YYYY-MM-DD format should be converted to Mon YYYY."""
-        assert format_month("2025-01-15") == "Jan 2025"
-        assert format_month("2024-12-31") == "Dec 2024"
-
-    def test_invalid_date_returns_original(self):
-        """Invalid dates should return the original string."""
-        assert format_month("invalid") == "invalid"
-        assert format_month("") == ""
-        assert format_month("2025") == "2025"
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("2025-01", "Jan 2025"),
+            ("2024-12", "Dec 2024"),
+            ("2025-06", "Jun 2025"),
+            ("2025-01-15", "Jan 2025"),
+            ("2024-12-31", "Dec 2024"),
+            ("invalid", "invalid"),
+            ("", ""),
+            ("2025", "2025"),
+            ("2025-13", "2025-13"),
+            ("2024-", "2024-"),
+            ("-12", "-12"),
+            ("abcd-12", "abcd-12"),
+            ("2024-1-05", "Jan 2024"),
+        ],
+    )
+    def test_format_month(self, raw, expected):
+        """YYYY-MM[-DD] becomes Mon YYYY; anything else is returned unchanged."""
+        assert format_month(raw) == expected
 
 
 # ============================================================================
@@ -216,6 +209,16 @@ class TestDetermineTrend:
         assert trend == "Stable"
         assert percent == 0.0
 
+    def test_null_predicted_values(self):
+        """Null 'predicted' values should be treated as zero, not raise."""
+        predictions = [{"predicted": None}, {"predicted": 100}]
+        assert determine_trend(predictions) == ("Stable", 0.0)
+
+        predictions = [{"predicted": 100}, {"predicted": None}]
+        trend, percent = determine_trend(predictions)
+        assert trend == "Decreasing"
+        assert percent == pytest.approx(-100.0)
+
     def test_zero_first_value(self):
         """Zero first value should be 'Stable' to avoid division by zero."""
         predictions = [{"predicted": 0}, {"predicted": 100}]
@@ -319,7 +322,7 @@ class TestFormatDetailed:
         model_info = {"model_type": "SARIMA", "mape": 3.5, "training_end": "2024-12"}
 
         result = format_detailed("violent-crime", 1, predictions, model_info)
-        data = json.loads(result)
+        data = orjson.loads(result)
 
         assert data["offense"] == "violent-crime"
         assert data["months_forecasted"] == 1
@@ -334,7 +337,7 @@ class TestFormatDetailed:
         model_info = {"model_type": "SARIMA", "mape": 3.5, "training_end": "2024-12"}
 
         result = format_detailed("homicide", 1, predictions, model_info, history=history)
-        data = json.loads(result)
+        data = orjson.loads(result)
 
         assert "history" in data
         assert len(data["history"]) == 1
@@ -348,50 +351,35 @@ class TestFormatDetailed:
 class TestUcrForecastTool:
     """Tests for the main ucr_forecast tool function."""
 
-    @pytest.mark.asyncio
     async def test_valid_offense_prediction(self, mock_httpx_client, sample_prediction_response):
         """Test successful prediction for valid offense."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            result = await ucr_forecast_fn(offense="violent-crime", months_ahead=3)
+        result = await ucr_forecast_fn(offense="violent-crime", months_ahead=3)
 
         assert "Violent Crime Forecast" in result
         assert "next 3 months" in result
         mock_httpx_client.post.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_offense_alias_works(self, mock_httpx_client):
         """Test that offense aliases are properly normalized."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            result = await ucr_forecast_fn(offense="murder")  # alias for homicide
+        result = await ucr_forecast_fn(offense="murder")  # alias for homicide
 
         # Verify the API was called with the normalized offense
         call_args = mock_httpx_client.post.call_args
         assert "homicide" in call_args[0][0]
 
-    @pytest.mark.asyncio
     async def test_invalid_offense_error(self):
         """Test that invalid offense raises helpful error."""
-        with pytest.raises(ToolError) as exc_info:
+        with pytest.raises(ToolError, match=r"Unknown offense type.*Valid options are"):
             await ucr_forecast_fn(offense="invalid-crime-type")
 
-        error_message = str(exc_info.value)
-        assert "Unknown offense type" in error_message
-        assert "Valid options are" in error_message
-
-    @pytest.mark.asyncio
     async def test_invalid_months_ahead(self, mock_httpx_client):
         """Test that invalid months_ahead raises error."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            with pytest.raises(ToolError) as exc_info:
-                await ucr_forecast_fn(offense="homicide", months_ahead=15)
+        with pytest.raises(ToolError, match=r"must be between 1 and 12"):
+            await ucr_forecast_fn(offense="homicide", months_ahead=15)
 
-            assert "must be between 1 and 12" in str(exc_info.value)
-
-    @pytest.mark.asyncio
     async def test_summary_format_output(self, mock_httpx_client):
         """Test summary format produces prose output."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            result = await ucr_forecast_fn(offense="burglary", format="summary")
+        result = await ucr_forecast_fn(offense="burglary", format="summary")
 
         # Should be prose, not JSON
         assert "Burglary Forecast" in result
@@ -399,158 +387,151 @@ class TestUcrForecastTool:
         assert "Trend:" in result
         assert "Model:" in result
 
-    @pytest.mark.asyncio
     async def test_detailed_format_output(self, mock_httpx_client):
         """Test detailed format produces valid JSON."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            result = await ucr_forecast_fn(offense="burglary", format="detailed")
+        result = await ucr_forecast_fn(offense="burglary", format="detailed")
 
         # Should be valid JSON
-        data = json.loads(result)
+        data = orjson.loads(result)
         assert "offense" in data
         assert "predictions" in data
         assert "trend" in data
         assert "model" in data
 
-    @pytest.mark.asyncio
     async def test_include_history(self, mock_httpx_client):
         """Test that include_history fetches historical data."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            result = await ucr_forecast_fn(
-                offense="property-crime",
-                include_history=True,
-            )
+        result = await ucr_forecast_fn(
+            offense="property-crime",
+            include_history=True,
+        )
 
         # Should have made both prediction and history requests
         mock_httpx_client.post.assert_called_once()
         mock_httpx_client.get.assert_called_once()
         assert "Recent History:" in result
 
-    @pytest.mark.asyncio
     async def test_invalid_format_error(self, mock_httpx_client):
         """Test that invalid format raises error."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            with pytest.raises(ToolError) as exc_info:
-                await ucr_forecast_fn(offense="homicide", format="invalid")
-
-            assert "Invalid format" in str(exc_info.value)
+        with pytest.raises(ToolError, match=r"Invalid format"):
+            await ucr_forecast_fn(offense="homicide", format="invalid")
 
-    @pytest.mark.asyncio
-    async def test_api_timeout_error(self):
+    async def test_api_timeout_error(self, mock_transport):
         """Test handling of API timeout."""
-        mock_client = AsyncMock()
-        mock_client.post = AsyncMock(side_effect=httpx.TimeoutException("Timeout"))
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
 
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_client):
-            with pytest.raises(ToolError) as exc_info:
-                await ucr_forecast_fn(offense="homicide")
+        def handler(request):
+            raise httpx.ReadTimeout("Timeout", request=request)
 
-            assert "not responding" in str(exc_info.value)
+        mock_transport(handler)
 
-    @pytest.mark.asyncio
-    async def test_api_404_error(self):
-        """Test handling of 404 from API."""
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_response.text = "Not Found"
-        mock_response.raise_for_status = MagicMock(
-            side_effect=httpx.HTTPStatusError(
-                "Not Found",
-                request=MagicMock(),
-                response=mock_response,
-            )
-        )
+        with pytest.raises(ToolError, match=r"not responding"):
+            await ucr_forecast_fn(offense="homicide")
 
-        mock_client = AsyncMock()
-        mock_client.post = AsyncMock(return_value=mock_response)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
-
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_client):
-            with pytest.raises(ToolError) as exc_info:
-                await ucr_forecast_fn(offense="homicide")
+    async def test_api_404_error(self, mock_transport):
+        """Test handling of 404 from API."""
+        mock_transport(lambda request: httpx.Response(404))
 
-            assert "No prediction model found" in str(exc_info.value)
+        with pytest.raises(ToolError, match=r"No prediction model found"):
+            await ucr_forecast_fn(offense="homicide")
 
-    @pytest.mark.asyncio
-    async def test_api_500_error(self):
+    async def test_api_500_error(self, mock_transport):
         """Test handling of 500 from API."""
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal Server Error"
-        mock_response.raise_for_status = MagicMock(
-            side_effect=httpx.HTTPStatusError(
-                "Server Error",
-                request=MagicMock(),
-                response=mock_response,
-            )
-        )
-
-        mock_client = AsyncMock()
-        mock_client.post = AsyncMock(return_value=mock_response)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_transport(lambda request: httpx.Response(500))
 
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_client):
-            with pytest.raises(ToolError) as exc_info:
-                await ucr_forecast_fn(offense="homicide")
+        with pytest.raises(ToolError, match=r"experiencing issues"):
+            await ucr_forecast_fn(offense="homicide")
 
-            assert "experiencing issues" in str(exc_info.value)
-
-    @pytest.mark.asyncio
-    async def test_api_connection_error(self):
+    async def test_api_connection_error(self, mock_transport):
         """Test handling of connection error."""
-        mock_client = AsyncMock()
-        mock_client.post = AsyncMock(
-            side_effect=httpx.RequestError("Connection failed")
-        )
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
 
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_client):
-            with pytest.raises(ToolError) as exc_info:
-                await ucr_forecast_fn(offense="homicide")
+        def handler(request):
+            raise httpx.ConnectError("Connection failed", request=request)
 
-            assert "Could not connect" in str(exc_info.value)
+        mock_transport(handler)
 
-    @pytest.mark.asyncio
-    async def test_history_failure_does_not_break(self, sample_prediction_response):
+        with pytest.raises(ToolError, match=r"Could not connect"):
+            await ucr_forecast_fn(offense="homicide")
+
+    async def test_history_failure_does_not_break(
+        self, mock_transport, sample_prediction_response
+    ):
         """Test that history fetch failure doesn't break the main prediction."""
-        mock_pred_response = MagicMock()
-        mock_pred_response.status_code = 200
-        mock_pred_response.json.return_value = sample_prediction_response
-        mock_pred_response.raise_for_status = MagicMock()
-
-        mock_history_response = MagicMock()
-        mock_history_response.status_code = 500
-        mock_history_response.raise_for_status = MagicMock(
-            side_effect=httpx.HTTPStatusError(
-                "Error",
-                request=MagicMock(),
-                response=mock_history_response,
-            )
-        )
 
-        mock_client = AsyncMock()
-        mock_client.post = AsyncMock(return_value=mock_pred_response)
-        mock_client.get = AsyncMock(return_value=mock_history_response)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
+        def handler(request):
+            if request.method == "POST":
+                return httpx.Response(200, json=sample_prediction_response)
+            return httpx.Response(500)
 
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_client):
-            # Should not raise, just omit history
-            result = await ucr_forecast_fn(offense="homicide", include_history=True)
+        mock_transport(handler)
+
+        # Should not raise, just omit history
+        result = await ucr_forecast_fn(offense="homicide", include_history=True)
 
         assert "Homicide Forecast" in result
         assert "Recent History:" not in result  # History should be omitted
 
-    @pytest.mark.asyncio
+    async def test_prediction_and_history_run_concurrently(self, mock_httpx_client):
+        """Test that the history request starts before the prediction finishes."""
+        history_started = asyncio.Event()
+        prediction_response = mock_httpx_client.post.return_value
+        history_response = mock_httpx_client.get.return_value
+
+        async def slow_prediction(*args, **kwargs):
+            await history_started.wait()
+            return prediction_response
+
+        async def history(*args, **kwargs):
+            history_started.set()
+            return history_response
+
+        mock_httpx_client.post = AsyncMock(side_effect=slow_prediction)
+        mock_httpx_client.get = AsyncMock(side_effect=history)
+
+        result = await asyncio.wait_for(
+            ucr_forecast_fn(offense="burglary", include_history=True), timeout=1
+        )
+
+        assert "Recent History:" in result
+
+    async def test_repeat_call_served_from_cache(self, mock_httpx_client):
+        """Identical forecasts should reuse the cached backend responses."""
+        first = await ucr_forecast_fn(
+            offense="burglary", include_history=True, format="detailed"
+        )
+        second = await ucr_forecast_fn(offense="burglary", include_history=True)
+
+        assert orjson.loads(first)["offense"] == "burglary"
+        assert "Burglary Forecast" in second
+        mock_httpx_client.post.assert_called_once()
+        mock_httpx_client.get.assert_called_once()
+
+    async def test_requests_use_paths_relative_to_base_url(self, mock_httpx_client):
+        """Requests should pass bare paths and rely on the client's base_url."""
+        await ucr_forecast_fn(offense="burglary", include_history=True)
+
+        assert mock_httpx_client.post.call_args[0][0] == "/api/v1/predict/burglary"
+        assert mock_httpx_client.get.call_args[0][0] == "/api/v1/history/burglary"
+
+    async def test_summary_requests_selected_fields(self, mock_httpx_client):
+        """Summary format should ask the backend for only the fields it renders."""
+        await ucr_forecast_fn(offense="burglary", format="summary")
+        await ucr_forecast_fn(offense="homicide", format="detailed")
+
+        summary_call, detailed_call = mock_httpx_client.post.call_args_list
+        assert summary_call[1]["params"]["fields"] == SUMMARY_FIELDS
+        assert "fields" not in detailed_call[1]["params"]
+
+    async def test_repeat_call_reuses_formatted_output(self, mock_httpx_client):
+        """Identical calls should return the cached output without reformatting."""
+        first = await ucr_forecast_fn(offense="burglary")
+        with patch("tools.ucr_forecast.format_summary") as format_summary_mock:
+            second = await ucr_forecast_fn(offense="burglary")
+
+        assert second == first
+        format_summary_mock.assert_not_called()
+
     async def test_default_parameters(self, mock_httpx_client):
         """Test that default parameters are used correctly."""
-        with patch("tools.ucr_forecast.httpx.AsyncClient", return_value=mock_httpx_client):
-            result = await ucr_forecast_fn(offense="burglary")
+        result = await ucr_forecast_fn(offense="burglary")
 
         # Should use default months_ahead=6 and format="summary"
         call_args = mock_httpx_client.post.call_args
@@ -1,5 +1,6 @@
 """Tests for ucr_history tool."""
 
+import orjson
 import pytest
 from unittest.mock import AsyncMock, patch
 from fastmcp.exceptions import ToolError
@@ -12,6 +13,15 @@ from tools.ucr_history import (
     calculate_yearly_totals,
     format_number,
     parse_api_date,
+    current_year,
+    parse_offense_records,
+    format_detailed,
+    format_summary,
+    fetch_national_history,
+    fetch_state_history,
+    FBI_API_BASE_URL,
+    _history_cache,
+    _output_cache,
 )
 
 # Access the underlying function for testing (FastMCP decorator pattern)
@@ -124,6 +134,20 @@ class TestCalculateYearlyTotals:
         """Should return empty dict for empty data."""
         assert calculate_yearly_totals([]) == {}
 
+    def test_summary_matches_separate_helpers(self):
+        """format_summary's single pass should agree with the standalone helpers."""
+        data = [
+            {"date": "2020-01", "actual": 100},
+            {"date": "2020-02", "actual": 150},
+            {"date": "2021-01", "actual": 200},
+        ]
+        summary = format_summary("homicide", "national", data, 2020, 2021)
+
+        direction, change = calculate_trend(data)
+        assert f"Overall Trend: {direction} ({change:+.1f}%" in summary
+        assert "- 2020: 250 incidents" in summary
+        assert "- 2021: 200 incidents" in summary
+
 
 class TestHelperFunctions:
     """Tests for utility functions."""
@@ -140,12 +164,67 @@ class TestHelperFunctions:
         assert parse_api_date("12-2021") == "2021-12"
         # Should handle already normalized dates
         assert parse_api_date("2020-01") == "2020-01"
+        # Anything without an MM- prefix passes through unchanged
+        assert parse_api_date("2020") == "2020"
+
+    def test_current_year_is_cached(self):
+        """The current year should be computed once and then reused."""
+        expected = current_year()
+        with patch("tools.ucr_history.datetime") as mock_datetime:
+            assert current_year() == expected
+        mock_datetime.fromtimestamp.assert_not_called()
+
+    def test_current_year_follows_utc_midnight(self, monkeypatch):
+        """The cached year should roll over at UTC midnight, when it expires."""
+        monkeypatch.setattr("tools.ucr_history._current_year", 0)
+        monkeypatch.setattr("tools.ucr_history._year_expiry", 0.0)
+        new_year = 1735689600  # 2025-01-01T00:00:00Z
+        with patch("tools.ucr_history.time.time", return_value=new_year - 1):
+            assert current_year() == 2024
+        with patch("tools.ucr_history.time.time", return_value=new_year):
+            assert current_year() == 2025
+
+    def test_parse_offense_records_orders_months(self):
+        """Records should come out date-ordered, including out-of-range months."""
+        data = {
+            "offenses": {
+                "actuals": {
+                    "S": {"02-2021": 3, "2019-06": 9, "12-2020": 2, "01-2020": 1}
+                },
+                "rates": {"S": {"12-2020": 0.5}},
+            }
+        }
+        records = parse_offense_records(data, "S", 2020, 2021)
+
+        assert [r["date"] for r in records] == [
+            "2019-06",
+            "2020-01",
+            "2020-12",
+            "2021-02",
+        ]
+        assert records[2]["rate"] == 0.5
+        assert records[0]["rate"] is None
+
+
+class TestFormatDetailed:
+    """Tests for detailed JSON output."""
+
+    def test_detailed_output_is_json_with_string_year_keys(self):
+        """Yearly totals should serialize with string keys, as stdlib json did."""
+        data = [
+            {"date": "2020-01", "actual": 100, "rate": 1.0},
+            {"date": "2021-01", "actual": 120, "rate": 1.2},
+        ]
+        result = orjson.loads(format_detailed("homicide", "national", data, 2020, 2021))
+
+        assert result["yearly_totals"] == {"2020": 100, "2021": 120}
+        assert result["monthly_data"] == data
+        assert result["trend"]["direction"] == "Increasing"
 
 
 class TestUcrHistoryValidation:
     """Tests for ucr_history parameter validation."""
 
-    @pytest.mark.asyncio
     async def test_invalid_offense_raises_error(self):
         """Should raise ToolError for invalid offense."""
         with pytest.raises(ToolError, match="Unknown offense type"):
@@ -155,7 +234,6 @@ class TestUcrHistoryValidation:
                 to_year=2021,
             )
 
-    @pytest.mark.asyncio
     async def test_invalid_state_raises_error(self):
         """Should raise ToolError for invalid state."""
         with pytest.raises(ToolError, match="Unknown state code"):
@@ -166,7 +244,6 @@ class TestUcrHistoryValidation:
                 state="ZZ",
             )
 
-    @pytest.mark.asyncio
     async def test_invalid_year_range_raises_error(self):
         """Should raise ToolError when from_year > to_year."""
         with pytest.raises(ToolError, match="must be less than or equal"):
@@ -176,7 +253,6 @@ class TestUcrHistoryValidation:
                 to_year=2020,
             )
 
-    @pytest.mark.asyncio
     async def test_year_before_2015_raises_error(self):
         """Should raise ToolError for year before 2015."""
         with pytest.raises(ToolError, match="2015 or later"):
@@ -186,7 +262,6 @@ class TestUcrHistoryValidation:
                 to_year=2020,
             )
 
-    @pytest.mark.asyncio
     async def test_invalid_format_raises_error(self):
         """Should raise ToolError for invalid format."""
         with pytest.raises(ToolError, match="Invalid format"):
@@ -198,10 +273,158 @@ class TestUcrHistoryValidation:
             )
 
 
+@pytest.fixture(autouse=True)
+def clear_history_cache():
+    """Start each test with empty history and output caches."""
+    _history_cache.clear()
+    _output_cache.clear()
+    yield
+    _history_cache.clear()
+    _output_cache.clear()
+
+
+class TestFetchHistory:
+    """Tests for the FBI API fetchers with a mocked shared client."""
+
+    async def test_transient_gateway_error_is_retried(self, make_response):
+        """A 502 from the FBI API should be retried before surfacing."""
+        payload = {"offenses": {"actuals": {"Texas Offenses": {"01-2021": 42}}, "rates": {}}}
+        bad_gateway = make_response(status_code=502)
+        mock_client = AsyncMock()
+        mock_client.get.side_effect = [bad_gateway, make_response(payload)]
+
+        with patch("tools.ucr_history.get_client", return_value=mock_client), patch(
+            "tools._http.asyncio.sleep", new=AsyncMock()
+        ):
+            records = await fetch_state_history("TX", "burglary", 2021, 2021)
+
+        assert records == [{"date": "2021-01", "actual": 42, "rate": None}]
+        assert mock_client.get.await_count == 2
+
+    async def test_national_history_uses_shared_client(self, make_response):
+        """Should request a relative path on the FBI API client and parse records."""
+        payload = {
+            "offenses": {
+                "actuals": {"United States Offenses": {"02-2020": 120, "01-2020": 100}},
+                "rates": {"United States Offenses": {"01-2020": 1.5, "02-2020": 1.8}},
+            }
+        }
+        mock_client = AsyncMock()
+        mock_client.get.return_value = make_response(payload)
+
+        with patch("tools.ucr_history.get_client", return_value=mock_client) as get_client:
+            records = await fetch_national_history("homicide", 2020, 2020)
+
+        get_client.assert_called_with(FBI_API_BASE_URL)
+        assert mock_client.get.call_args[0][0] == "/summarized/national/homicide"
+        assert records == [
+            {"date": "2020-01", "actual": 100, "rate": 1.5},
+            {"date": "2020-02", "actual": 120, "rate": 1.8},
+        ]
+
+    async def test_state_history_uses_state_offenses_key(self, make_response):
+        """Should read the '<State> Offenses' series for state requests."""
+        payload = {"offenses": {"actuals": {"Texas Offenses": {"01-2021": 42}}, "rates": {}}}
+        mock_client = AsyncMock()
+        mock_client.get.return_value = make_response(payload)
+
+        with patch("tools.ucr_history.get_client", return_value=mock_client):
+            records = await fetch_state_history("TX", "burglary", 2021, 2021)
+
+        assert mock_client.get.call_args[0][0] == "/summarized/state/TX/burglary"
+        assert records == [{"date": "2021-01", "actual": 42, "rate": None}]
+
+    async def test_long_range_fetched_in_two_year_chunks(self, make_response):
+        """Ranges of four or more years should split into ordered two-year requests."""
+
+        def route(path, params, **kwargs):
+            first, last = int(params["from"][-4:]), int(params["to"][-4:])
+            actuals = {
+                f"{month}-{year}": 1
+                for year in range(first, last + 1)
+                for month in ("02", "01")
+            }
+            series = {"actuals": {"United States Offenses": actuals}, "rates": {}}
+            return make_response({"offenses": series})
+
+        mock_client = AsyncMock()
+        mock_client.get.side_effect = route
+
+        with patch("tools.ucr_history.get_client", return_value=mock_client):
+            records = await fetch_national_history("homicide", 2019, 2023)
+
+        requested = sorted(
+            (call[1]["params"]["from"], call[1]["params"]["to"])
+            for call in mock_client.get.call_args_list
+        )
+        assert requested == [
+            ("01-2019", "12-2020"),
+            ("01-2021", "12-2022"),
+            ("01-2023", "12-2023"),
+        ]
+        assert [r["date"] for r in records] == [
+            f"{year}-{month}" for year in range(2019, 2024) for month in ("01", "02")
+        ]
+
+    @pytest.mark.parametrize("missing", [404, "empty"])
+    async def test_unpublished_chunk_returns_no_records(self, make_response, missing):
+        """A 404 or empty chunk should drop its years, not fail the whole range."""
+        payload = {
+            "offenses": {
+                "actuals": {"United States Offenses": {"01-2020": 1, "01-2021": 2}},
+                "rates": {},
+            }
+        }
+
+        def route(path, params, **kwargs):
+            if params["from"] == "01-2022":
+                if missing == 404:
+                    return make_response(status_code=404)
+                return make_response()
+            return make_response(payload)
+
+        mock_client = AsyncMock()
+        mock_client.get.side_effect = route
+
+        with patch("tools.ucr_history.get_client", return_value=mock_client):
+            records = await fetch_national_history("homicide", 2020, 2023)
+
+        assert mock_client.get.await_count == 2
+        assert [r["date"] for r in records] == ["2020-01", "2021-01"]
+
+    async def test_repeat_fetch_served_from_cache(self, make_response):
+        """Identical requests should reuse cached records without refetching."""
+        payload = {"offenses": {"actuals": {"Texas Offenses": {"01-2021": 42}}, "rates": {}}}
+        mock_client = AsyncMock()
+        mock_client.get.return_value = make_response(payload)
+
+        with patch("tools.ucr_history.get_client", return_value=mock_client):
+            first = await fetch_state_history("TX", "burglary", 2021, 2021)
+            second = await fetch_state_history("TX", "burglary", 2021, 2021)
+
+        assert second == first
+        mock_client.get.assert_called_once()
+
+    async def test_repeat_tool_call_served_from_output_cache(self):
+        """Identical tool calls should reuse the formatted output."""
+        records = [{"date": "2021-01", "actual": 42, "rate": None}]
+        fetch = AsyncMock(return_value=records)
+
+        with patch("tools.ucr_history.fetch_state_history", new=fetch):
+            first = await ucr_history_fn(
+                offense="burglary", state="tx", from_year=2021, to_year=2021
+            )
+            second = await ucr_history_fn(
+                offense="burglary", state="TX", from_year=2021, to_year=2021
+            )
+
+        assert second == first
+        fetch.assert_awaited_once()
+
+
 class TestUcrHistoryIntegration:
     """Integration tests for ucr_history (require FBI API)."""
 
-    @pytest.mark.asyncio
     @pytest.mark.integration
     async def test_national_history_summary(self):
         """Test fetching national history in summary format."""
@@ -216,26 +439,22 @@ class TestUcrHistoryIntegration:
         assert "Annual Totals:" in result
         assert "2020" in result or "2021" in result
 
-    @pytest.mark.asyncio
     @pytest.mark.integration
     async def test_national_history_detailed(self):
         """Test fetching national history in detailed format."""
-        import json
-
         result = await ucr_history_fn(
             offense="homicide",
             from_year=2020,
             to_year=2022,
             format="detailed",
         )
-        data = json.loads(result)
+        data = orjson.loads(result)
         assert data["offense"] == "homicide"
         assert data["location"] == "national"
         assert "monthly_data" in data
         assert "yearly_totals" in data
         assert "trend" in data
 
-    @pytest.mark.asyncio
     @pytest.mark.integration
     async def test_state_history(self):
         """Test fetching state-level history."""
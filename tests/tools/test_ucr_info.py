@@ -1,15 +1,36 @@
 """Tests for ucr_info tool."""
 
-import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
+
 import httpx
+import pytest
 from fastmcp.exceptions import ToolError
-from tools.ucr_info import ucr_info, _format_month, _format_model_type, _format_all_models, _format_model_details
+
+from tools._http import UCR_API_BASE
+from tools.ucr_info import (
+    _format_all_models,
+    _format_model_details,
+    _format_model_type,
+    _format_month,
+    _models_cache,
+    _output_cache,
+    ucr_info,
+)
 
 # Access the underlying function for testing (FastMCP decorator pattern)
 ucr_info_fn = ucr_info.fn
 
 
+@pytest.fixture(autouse=True)
+def clear_models_cache():
+    """Start each test with empty models and output caches."""
+    _models_cache.clear()
+    _output_cache.clear()
+    yield
+    _models_cache.clear()
+    _output_cache.clear()
+
+
 # Sample API response data
 SAMPLE_MODELS_RESPONSE = {
     "models": [
@@ -18,6 +39,7 @@ SAMPLE_MODELS_RESPONSE = {
             "model_type": "ARIMA",
             "mape": 9.0,
             "training_end": "2024-12",
+            "location": "national",
             "parameters": {"order": [1, 1, 1]},
         },
         {
@@ -25,6 +47,7 @@ SAMPLE_MODELS_RESPONSE = {
             "model_type": "ARIMA",
             "mape": 7.9,
             "training_end": "2024-12",
+            "location": "national",
             "parameters": {"order": [1, 1, 1]},
         },
         {
@@ -32,6 +55,7 @@ SAMPLE_MODELS_RESPONSE = {
             "model_type": "Prophet",
             "mape": 8.2,
             "training_end": "2024-12",
+            "location": "national",
             "parameters": {},
         },
         {
@@ -39,6 +63,7 @@ SAMPLE_MODELS_RESPONSE = {
             "model_type": "ARIMA",
             "mape": 7.7,
             "training_end": "2024-12",
+            "location": "national",
             "parameters": {"order": [1, 1, 1]},
         },
         {
@@ -46,21 +71,39 @@ SAMPLE_MODELS_RESPONSE = {
             "model_type": "SARIMA",
             "mape": 5.4,
             "training_end": "2024-12",
+            "location": "national",
             "parameters": {"order": [1, 1, 1], "seasonal_order": [1, 1, 1, 12]},
         },
     ]
 }
 
 
-class MockResponse:
-    """Mock httpx response object."""
+class ModelsBackend:
+    """MockTransport handler serving the models endpoint and recording requests."""
+
+    def __init__(self):
+        self.status_code = 200
+        self.payload = SAMPLE_MODELS_RESPONSE
+        self.error: Exception | None = None
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        return httpx.Response(self.status_code, json=self.payload)
 
-    def __init__(self, status_code: int, json_data: dict | None = None):
-        self.status_code = status_code
-        self._json_data = json_data or {}
 
-    def json(self):
-        return self._json_data
+@pytest.fixture
+async def models_backend(monkeypatch):
+    """Install a real shared client answered by a ModelsBackend."""
+    backend = ModelsBackend()
+    client = httpx.AsyncClient(
+        base_url=UCR_API_BASE, transport=httpx.MockTransport(backend)
+    )
+    monkeypatch.setattr("tools.ucr_info.get_client", lambda: client)
+    yield backend
+    await client.aclose()
 
 
 # --- Helper Function Tests ---
@@ -69,22 +112,24 @@ class MockResponse:
 class TestFormatMonth:
     """Tests for _format_month helper function."""
 
-    def test_format_valid_date(self):
-        """Test formatting a valid date string."""
-        assert _format_month("2024-12") == "December 2024"
-        assert _format_month("2024-01") == "January 2024"
-        assert _format_month("2023-06") == "June 2023"
-
-    def test_format_invalid_date(self):
-        """Test formatting invalid date strings returns original."""
-        assert _format_month("invalid") == "invalid"
-        assert _format_month("2024") == "2024"
-        assert _format_month("") == ""
-
-    def test_format_edge_months(self):
-        """Test edge case months."""
-        assert _format_month("2024-13") == "2024-13"  # Invalid month
-        assert _format_month("2024-00") == "2024-00"  # Invalid month
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("2024-12", "December 2024"),
+            ("2024-01", "January 2024"),
+            ("2024-1", "January 2024"),  # Unpadded month
+            ("2023-06", "June 2023"),
+            ("invalid", "invalid"),
+            ("2024", "2024"),
+            ("", ""),
+            ("2024-13", "2024-13"),  # Invalid month
+            ("2024-00", "2024-00"),  # Invalid month
+            ("abcd-12", "abcd-12"),  # Invalid year
+        ],
+    )
+    def test_format_month(self, raw, expected):
+        """Valid YYYY-MM dates are spelled out; anything else is returned as-is."""
+        assert _format_month(raw) == expected
 
 
 class TestFormatModelType:
@@ -112,30 +157,31 @@ class TestFormatModelType:
 class TestFormatAllModels:
     """Tests for _format_all_models helper function."""
 
-    def test_format_multiple_models(self):
+    def test_format_multiple_models(self, benchmark):
         """Test formatting all models output."""
-        result = _format_all_models(SAMPLE_MODELS_RESPONSE["models"])
-
-        # Check header
-        assert "FBI UCR Crime Forecasting Models" in result
-        assert "Available Models:" in result
-
-        # Check all offenses are listed
-        assert "violent-crime" in result
-        assert "property-crime" in result
-        assert "homicide" in result
-        assert "burglary" in result
-        assert "motor-vehicle-theft" in result
-
-        # Check accuracy is calculated correctly (100 - MAPE)
-        assert "91.0%" in result  # violent-crime: 100 - 9.0
-        assert "92.1%" in result  # property-crime: 100 - 7.9
-        assert "94.6%" in result  # motor-vehicle-theft: 100 - 5.4
-
-        # Check footer info
-        assert "FBI Uniform Crime Reporting (UCR) Program" in result
-        assert "National level" in result
-        assert "Up to 12 months" in result
+        result = benchmark(_format_all_models, SAMPLE_MODELS_RESPONSE["models"])
+
+        expected = (
+            # Header
+            "FBI UCR Crime Forecasting Models",
+            "Available Models:",
+            # All offenses are listed
+            "violent-crime",
+            "property-crime",
+            "homicide",
+            "burglary",
+            "motor-vehicle-theft",
+            # Accuracy is 100 - MAPE
+            "91.0%",  # violent-crime: 100 - 9.0
+            "92.1%",  # property-crime: 100 - 7.9
+            "94.6%",  # motor-vehicle-theft: 100 - 5.4
+            # Footer
+            "FBI Uniform Crime Reporting (UCR) Program",
+            "National level",
+            "Up to 12 months",
+        )
+        missing = [text for text in expected if text not in result]
+        assert not missing, missing
 
     def test_format_empty_models(self):
         """Test formatting with empty models list."""
@@ -154,6 +200,7 @@ class TestFormatModelDetails:
             "model_type": "SARIMA",
             "mape": 5.4,
             "training_end": "2024-12",
+            "location": "national",
             "parameters": {"order": [1, 1, 1], "seasonal_order": [1, 1, 1, 12]},
         }
         result = _format_model_details(model)
@@ -172,6 +219,7 @@ class TestFormatModelDetails:
             "model_type": "SARIMA",
             "mape": 5.4,
             "training_end": "2024-12",
+            "location": "national",
             "parameters": {},
         }
         result = _format_model_details(model)
@@ -182,193 +230,82 @@ class TestFormatModelDetails:
 # --- Main Tool Function Tests ---
 
 
-@pytest.mark.asyncio
-async def test_ucr_info_list_all_models():
+async def test_ucr_info_list_all_models(models_backend):
     """Test listing all models when no offense is specified."""
-    mock_response = MockResponse(200, SAMPLE_MODELS_RESPONSE)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        result = await ucr_info_fn(offense=None)
-
-        assert "FBI UCR Crime Forecasting Models" in result
-        assert "violent-crime" in result
-        assert "property-crime" in result
-        assert "homicide" in result
-        assert "burglary" in result
-        assert "motor-vehicle-theft" in result
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_specific_offense():
+    result = await ucr_info_fn(offense=None)
+
+    assert "FBI UCR Crime Forecasting Models" in result
+    assert "violent-crime" in result
+    assert "property-crime" in result
+    assert "homicide" in result
+    assert "burglary" in result
+    assert "motor-vehicle-theft" in result
+
+
+async def test_ucr_info_requests_relative_path(models_backend):
+    """Requests should pass a bare path and rely on the shared client's base_url."""
+    await ucr_info_fn(state="ca")
+
+    (request,) = models_backend.requests
+    assert str(request.url) == f"{UCR_API_BASE}/api/v1/models?state=CA"
+
+
+async def test_ucr_info_repeat_call_served_from_output_cache(models_backend):
+    """Identical calls should reuse the formatted listing."""
+    with patch(
+        "tools.ucr_info._format_all_models", wraps=_format_all_models
+    ) as format_all:
+        first = await ucr_info_fn()
+        second = await ucr_info_fn()
+
+    assert second == first
+    format_all.assert_called_once()
+    assert len(models_backend.requests) == 1
+
+
+@pytest.mark.parametrize(
+    "offense,title,model_type,accuracy",
+    [
+        ("motor-vehicle-theft", "Motor Vehicle Theft", "SARIMA", "94.6%"),  # 100 - 5.4
+        ("MOTOR-VEHICLE-THEFT", "Motor Vehicle Theft", "SARIMA", "94.6%"),  # any case
+        ("homicide", "Homicide", "Prophet", "91.8%"),  # 100 - 8.2
+        ("burglary", "Burglary", "ARIMA", "92.3%"),  # 100 - 7.7
+    ],
+)
+async def test_ucr_info_specific_offense(
+    models_backend, offense, title, model_type, accuracy
+):
     """Test getting info for a specific offense."""
-    mock_response = MockResponse(200, SAMPLE_MODELS_RESPONSE)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        result = await ucr_info_fn(offense="motor-vehicle-theft")
-
-        assert "Motor Vehicle Theft Forecasting Model" in result
-        assert "SARIMA" in result
-        assert "94.6%" in result
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_case_insensitive_offense():
-    """Test that offense lookup is case insensitive."""
-    mock_response = MockResponse(200, SAMPLE_MODELS_RESPONSE)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        result = await ucr_info_fn(offense="MOTOR-VEHICLE-THEFT")
-
-        assert "Motor Vehicle Theft Forecasting Model" in result
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_invalid_offense():
-    """Test error handling for invalid offense."""
-    mock_response = MockResponse(200, SAMPLE_MODELS_RESPONSE)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        with pytest.raises(ToolError, match="not found"):
-            await ucr_info_fn(offense="invalid-offense")
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_invalid_offense_shows_available():
-    """Test that invalid offense error lists available offenses."""
-    mock_response = MockResponse(200, SAMPLE_MODELS_RESPONSE)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        with pytest.raises(ToolError) as exc_info:
-            await ucr_info_fn(offense="invalid-offense")
-
-        error_message = str(exc_info.value)
-        assert "violent-crime" in error_message
-        assert "property-crime" in error_message
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_api_error():
-    """Test handling of API errors."""
-    mock_response = MockResponse(500)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        with pytest.raises(ToolError, match="HTTP 500"):
-            await ucr_info_fn()
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_empty_models():
-    """Test handling when API returns no models."""
-    mock_response = MockResponse(200, {"models": []})
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        with pytest.raises(ToolError, match="No models available"):
-            await ucr_info_fn()
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_timeout():
-    """Test handling of request timeout."""
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.side_effect = httpx.TimeoutException("Timeout")
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        with pytest.raises(ToolError, match="timed out"):
-            await ucr_info_fn()
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_network_error():
-    """Test handling of network errors."""
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.side_effect = httpx.RequestError("Connection failed")
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        with pytest.raises(ToolError, match="Network error"):
-            await ucr_info_fn()
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_homicide_offense():
-    """Test getting info for homicide offense."""
-    mock_response = MockResponse(200, SAMPLE_MODELS_RESPONSE)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        result = await ucr_info_fn(offense="homicide")
-
-        assert "Homicide Forecasting Model" in result
-        assert "Prophet" in result
-        assert "91.8%" in result  # 100 - 8.2
-
-
-@pytest.mark.asyncio
-async def test_ucr_info_burglary_offense():
-    """Test getting info for burglary offense."""
-    mock_response = MockResponse(200, SAMPLE_MODELS_RESPONSE)
-
-    with patch("tools.ucr_info.httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_instance.get.return_value = mock_response
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
-        mock_client.return_value = mock_instance
-
-        result = await ucr_info_fn(offense="burglary")
-
-        assert "Burglary Forecasting Model" in result
-        assert "ARIMA" in result
-        assert "92.3%" in result  # 100 - 7.7
+    result = await ucr_info_fn(offense=offense)
+
+    assert f"{title} Forecasting Model" in result
+    assert model_type in result
+    assert accuracy in result
+
+
+async def test_ucr_info_invalid_offense(models_backend):
+    """Test that an unknown offense is rejected with the available offenses listed."""
+    with pytest.raises(ToolError, match="not found") as exc_info:
+        await ucr_info_fn(offense="invalid-offense")
+
+    error_message = str(exc_info.value)
+    assert "violent-crime" in error_message
+    assert "property-crime" in error_message
+
+
+@pytest.mark.parametrize(
+    "attr,value,pattern",
+    [
+        ("status_code", 500, "HTTP 500"),
+        ("payload", {"models": []}, "No models available"),
+        ("error", httpx.ReadTimeout("Timeout"), "timed out"),
+        ("error", httpx.ConnectError("Connection failed"), "Network error"),
+    ],
+    ids=["api-error", "empty-models", "timeout", "network-error"],
+)
+async def test_ucr_info_backend_errors(models_backend, attr, value, pattern):
+    """Test that backend failures surface as ToolErrors."""
+    setattr(models_backend, attr, value)
+
+    with pytest.raises(ToolError, match=pattern):
+        await ucr_info_fn()